@@ -0,0 +1,179 @@
+# batchSearch.py
+# --------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Solves many search problems at once on a pool of processes.
+
+Every problem is described by a SearchSpec (or a tuple or dictionary with
+the same fields), and solveMany yields a SearchResult as soon as each one
+is solved, in whatever order they finish:
+
+  specs = [SearchSpec('bigMaze', start=(x, 1), fn='astar', heuristic='manhattanHeuristic') for x in range(1, 10)]
+  for result in solveMany(specs):
+      print(result.index, result.cost, result.expanded)
+
+Each worker process loads a layout the first time one of its problems uses
+it and keeps it, so the layouts (and the successor and distance tables
+built from their walls) are shared by all the problems a worker solves.
+"""
+
+import multiprocessing
+import time
+
+from game import Configuration, Directions
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+class SearchSpec:
+    """
+    One problem to solve: the problem type from searchAgents.py on a layout,
+    with Pacman moved to start if it is given, solved by the search function
+    fn (a name or abbreviation in search.py) with the named heuristic.  goal
+    is passed on to a PositionSearchProblem, and searchArgs to the search
+    function.
+    """
+
+    def __init__(self, layout, problem='PositionSearchProblem', start=None, goal=None, fn='bfs', heuristic=None, searchArgs=None):
+        self.layout = layout
+        self.problem = problem
+        self.start = start
+        self.goal = goal
+        self.fn = fn
+        self.heuristic = heuristic
+        self.searchArgs = searchArgs or {}
+
+    def __repr__(self):
+        return 'SearchSpec(%r, %r, start=%r, goal=%r, fn=%r, heuristic=%r)' % (
+            self.layout, self.problem, self.start, self.goal, self.fn, self.heuristic)
+
+def makeSpec(spec):
+    "Turns a (layout, problem, start, goal, fn, heuristic) tuple or a dictionary into a SearchSpec"
+    if isinstance(spec, SearchSpec): return spec
+    if isinstance(spec, dict): return SearchSpec(**spec)
+    return SearchSpec(*spec)
+
+class SearchResult:
+    """
+    The outcome of a SearchSpec: index is its position in the input, actions
+    the path found (None if there is none), stats the problem's SearchStats
+    as a dictionary and error the exception message if solving it failed.
+    """
+
+    def __init__(self, index, spec):
+        self.index = index
+        self.spec = spec
+        self.actions = None
+        self.cost = None
+        self.expanded = None
+        self.stats = None
+        self.seconds = None
+        self.error = None
+
+    def __repr__(self):
+        if self.error is not None:
+            return 'SearchResult(%d, error=%r)' % (self.index, self.error)
+        return 'SearchResult(%d, cost=%r, expanded=%r, seconds=%.4f)' % (self.index, self.cost, self.expanded, self.seconds)
+
+# Starting states of the layouts this process has loaded, by name
+_STATES = {}
+
+def startingState(layoutName, start=None):
+    "The starting GameState of a layout, loaded once per process, with Pacman moved to start"
+    if layoutName not in _STATES:
+        lay = layout.getLayout(layoutName)
+        if lay == None: raise Exception("The layout " + layoutName + " cannot be found")
+        state = pacman.GameState()
+        state.initialize(lay, lay.getNumGhosts())
+        _STATES[layoutName] = state
+    state = _STATES[layoutName]
+    if start is None or start == state.getPacmanPosition():
+        return state
+    state = pacman.GameState(state)     # Shares the layout, the food and the agent states until they change
+    state.data.mutableAgentState(0).configuration = Configuration(start, Directions.STOP)
+    return state
+
+def solve(indexedSpec):
+    "Solves one (index, spec) pair; this is what the worker processes run"
+    index, spec = indexedSpec
+    result = SearchResult(index, spec)
+    util.mutePrint()                    # Warnings and progress of the problems and searches
+    try:
+        state = startingState(spec.layout, spec.start)
+        problemType = getattr(searchAgents, spec.problem)
+        if spec.goal is not None:
+            problem = problemType(state, goal=spec.goal, warn=False, visualize=False)
+        else:
+            problem = problemType(state)
+        function = getattr(search, spec.fn)
+        if spec.heuristic is None:
+            actions = function(problem, **spec.searchArgs)
+        else:
+            heuristic = getattr(searchAgents, spec.heuristic, None) or getattr(search, spec.heuristic)
+            actions = function(problem, heuristic=heuristic, **spec.searchArgs)
+        result.actions = actions
+        result.cost = None if actions is None else problem.getCostOfActions(actions)
+        result.expanded = problem._expanded if '_expanded' in dir(problem) else None
+        if 'searchStats' in dir(problem):
+            result.stats = problem.searchStats.asDict()
+            result.seconds = problem.searchStats.totalTime
+    except Exception as e:
+        result.error = '%s: %s' % (type(e).__name__, e)
+    finally:
+        util.unmutePrint()
+    return result
+
+def solveMany(specs, processes=None, chunksize=4):
+    """
+    Solves every spec of an iterable and yields a SearchResult for each as
+    soon as it is ready, in completion order (use result.index to match it
+    with its spec).  The specs are spread over processes worker processes
+    (all the cores by default), chunksize at a time; with processes=1 they
+    are solved in this process, one after the other.
+
+    A spec that cannot be solved yields a result with its error set instead
+    of stopping the batch.
+    """
+    indexedSpecs = ((index, makeSpec(spec)) for index, spec in enumerate(specs))
+    if processes == 1:
+        for indexedSpec in indexedSpecs:
+            yield solve(indexedSpec)
+        return
+    pool = multiprocessing.Pool(processes)
+    try:
+        for result in pool.imap_unordered(solve, indexedSpecs, chunksize):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+def solveAll(specs, processes=None, chunksize=4):
+    "Solves every spec like solveMany and returns the results in the order of the specs"
+    results = list(solveMany(specs, processes, chunksize))
+    results.sort(key=lambda result: result.index)
+    return results
+
+if __name__ == '__main__':
+    # Shortest paths from every free cell of bigMaze to (1, 1), serially and in parallel
+    walls = startingState('bigMaze').getWalls()
+    specs = [SearchSpec('bigMaze', start=(x, y), goal=(1, 1), fn='astar', heuristic='manhattanHeuristic')
+             for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+    for processes in [1, None]:
+        started = time.time()
+        results = solveAll(specs, processes)
+        print('Solved %d problems with %s processes in %.2f seconds (%d nodes expanded)' % (
+            len(results), processes or multiprocessing.cpu_count(), time.time() - started,
+            sum(result.expanded for result in results)))
@@ -0,0 +1,270 @@
+# benchmark.py
+# ------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+A headless benchmark of the search functions in search.py.
+
+Every combination of search function, search problem, heuristic and layout
+that makes sense is solved a few times without any display, and the path
+cost, the nodes expanded and generated, the time and the peak frontier
+(and, with --memory, the peak bytes allocated) are reported:
+
+  python benchmark.py                                   # the default sweep
+  python benchmark.py -f bfs,astar,jps -p PositionSearchProblem -l bigMaze,openMaze -n 5
+  python benchmark.py -o baseline.json                  # save a report (.json or .csv)
+  python benchmark.py --compare baseline.json           # rerun it and flag regressions
+
+In compare mode the configurations of the baseline are run again, and a
+configuration regresses when it no longer finds a path, finds a costlier
+one, expands more nodes or gets slower than the tolerance allows.  The
+exit status is 1 if anything regressed.
+"""
+
+import csv
+import json
+import os
+import sys
+import tracemalloc
+
+import layout
+import pacman
+import search
+import searchAgents
+import util
+
+# The heuristics that can be used with every problem type
+HEURISTICS = {
+    'PositionSearchProblem': ['nullHeuristic', 'manhattanHeuristic', 'euclideanHeuristic'],
+    'AnyFoodSearchProblem': ['nullHeuristic'],
+    'CornersProblem': ['nullHeuristic', 'cornersHeuristic'],
+    'CornersMaskProblem': ['nullHeuristic', 'cornersMaskHeuristic'],
+    'FoodSearchProblem': ['nullHeuristic', 'foodHeuristic', 'mstFoodHeuristic'],
+    'FoodMaskSearchProblem': ['nullHeuristic', 'foodMaskHeuristic', 'mstFoodHeuristic'],
+}
+
+# Search functions that only work on some problem types
+PROBLEMS = {
+    'jumpPointSearch': ['PositionSearchProblem', 'AnyFoodSearchProblem'],
+    'bidirectionalBreadthFirstSearch': ['PositionSearchProblem'],
+    'bidirectionalAStarSearch': ['PositionSearchProblem'],
+}
+
+FIELDS = ['layout', 'function', 'problem', 'heuristic', 'status', 'cost', 'expanded', 'generated',
+          'peakFrontier', 'peakClosed', 'peakBytes', 'seconds', 'bestSeconds']
+
+def layoutNames(layoutDir='layouts'):
+    return sorted(name[:-4] for name in os.listdir(layoutDir) if name.endswith('.lay'))
+
+def startState(layoutName):
+    "The starting GameState of a layout"
+    lay = layout.getLayout(layoutName)
+    if lay == None: raise Exception("The layout " + layoutName + " cannot be found")
+    state = pacman.GameState()
+    state.initialize(lay, lay.getNumGhosts())
+    return state
+
+def suits(problemName, state, maxFood):
+    "Whether a problem type makes sense on the layout of a starting state"
+    numFood, walls = state.getNumFood(), state.getWalls()
+    if problemName == 'PositionSearchProblem':      # A maze with its single dot at (1, 1)
+        return numFood == 1 and state.hasFood(1, 1)
+    if problemName in ['CornersProblem', 'CornersMaskProblem']:
+        top, right = walls.height - 2, walls.width - 2
+        return all(state.hasFood(*corner) for corner in [(1, 1), (1, top), (right, 1), (right, top)])
+    if problemName == 'AnyFoodSearchProblem':
+        return numFood > 0
+    return 0 < numFood <= maxFood                   # Eating all the food is exponential in the dots
+
+def configurations(functions, problems, heuristics, layouts, maxFood):
+    "Yields the (layout, function, problem, heuristic) combinations worth running"
+    for layoutName in layouts:
+        state = startState(layoutName)
+        for problemName in problems:
+            if not suits(problemName, state, maxFood): continue
+            for fn in functions:
+                function = getattr(search, fn)
+                if problemName not in PROBLEMS.get(function.__name__, [problemName]): continue
+                if 'heuristic' not in function.__code__.co_varnames:
+                    yield layoutName, function.__name__, problemName, '-'
+                    continue
+                for heuristic in heuristics:
+                    if heuristic in HEURISTICS[problemName]:
+                        yield layoutName, function.__name__, problemName, heuristic
+
+def solve(state, function, problemName, heuristic):
+    "Runs one search and returns the problem and the actions, with prints muted"
+    util.mutePrint()
+    try:
+        problem = getattr(searchAgents, problemName)(state)
+        if heuristic == '-':
+            actions = function(problem)
+        elif heuristic in dir(searchAgents):
+            actions = function(problem, heuristic=getattr(searchAgents, heuristic))
+        else:
+            actions = function(problem, heuristic=getattr(search, heuristic))
+    finally:
+        util.unmutePrint()
+    return problem, actions
+
+def run(layoutName, fn, problemName, heuristic, repeat=3, timeout=10, memory=False):
+    """
+    Solves one configuration repeat times and returns its record: the median
+    and best times, and the path cost and node counts of the last run.
+    """
+    record = dict(layout=layoutName, function=fn, problem=problemName, heuristic=heuristic,
+                  status='ok', cost='', expanded='', generated='', peakFrontier='', peakClosed='',
+                  peakBytes='', seconds='', bestSeconds='')
+    state = startState(layoutName)
+    function = util.TimeoutFunction(getattr(search, fn), timeout)
+    times = []
+    try:
+        for i in range(repeat):
+            problem, actions = solve(state, function, problemName, heuristic)
+            times.append(problem.searchStats.totalTime)     # The search alone, not building the problem
+        if memory:                      # A separate run, tracing allocations slows the search down
+            tracemalloc.start()
+            try:
+                solve(state, function, problemName, heuristic)
+                record['peakBytes'] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    except util.TimeoutFunctionException:
+        record['status'] = 'timeout'
+        return record
+
+    stats = problem.searchStats
+    if actions == None:
+        record['status'] = 'failed'
+    elif 'gaveUp' in stats.details:     # The memory-bounded searches return an empty path
+        record['status'] = 'gave up'
+    else:
+        record['cost'] = problem.getCostOfActions(actions)
+    record['expanded'] = problem._expanded if '_expanded' in dir(problem) else stats.expanded
+    record['generated'] = stats.generated
+    record['peakFrontier'], record['peakClosed'] = stats.peakFrontier, stats.peakClosed
+    times.sort()
+    record['seconds'], record['bestSeconds'] = round(times[len(times) // 2], 6), round(times[0], 6)
+    return record
+
+def readReport(path):
+    "Loads a report written by writeReport, turning the numbers in a CSV back into numbers"
+    with open(path) as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        records = list(csv.DictReader(f))
+    for record in records:
+        for field in FIELDS[5:]:
+            if record[field] != '':
+                record[field] = searchAgents.searchArgument(record[field])
+    return records
+
+def writeReport(records, path):
+    with open(path, 'w', newline='') as f:
+        if path.endswith('.json'):
+            json.dump(records, f, indent=1)
+        else:
+            writer = csv.DictWriter(f, FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+
+def printRecord(record):
+    values = [record[field] for field in ['layout', 'function', 'problem', 'heuristic', 'status', 'cost', 'expanded', 'seconds']]
+    if isinstance(values[-1], float): values[-1] = '%.6f' % values[-1]
+    print('%-18s %-32s %-22s %-18s %-8s %6s %8s %9s' % tuple(str(value) for value in values))
+
+def regressions(baseline, current, tolerance):
+    "Returns the reasons a record is worse than its baseline (an empty list if it is not)"
+    if current['status'] != 'ok':
+        return ['status %s' % current['status']] if baseline['status'] == 'ok' else []
+    if baseline['status'] != 'ok':
+        return []
+    reasons = []
+    if current['cost'] > baseline['cost']:
+        reasons.append('cost %s -> %s' % (baseline['cost'], current['cost']))
+    if current['expanded'] > baseline['expanded']:
+        reasons.append('expanded %s -> %s' % (baseline['expanded'], current['expanded']))
+    # Timings are noisy, so small absolute differences are ignored
+    if current['seconds'] > baseline['seconds'] * (1 + tolerance) and current['seconds'] - baseline['seconds'] > 0.005:
+        reasons.append('time %.4fs -> %.4fs' % (baseline['seconds'], current['seconds']))
+    return reasons
+
+def readCommand(argv):
+    from optparse import OptionParser
+    usageStr = """
+    USAGE:      python benchmark.py <options>
+    EXAMPLES:   (1) python benchmark.py -o baseline.json
+                    - runs the default sweep and saves the report
+                (2) python benchmark.py --compare baseline.json
+                    - runs the same configurations again and flags regressions
+    """
+    parser = OptionParser(usageStr)
+    parser.add_option('-f', '--functions', dest='functions', default='bfs,ucs,astar,jps,bibfs',
+                      help='comma separated search functions (names or abbreviations in search.py) [Default: %default]')
+    parser.add_option('-p', '--problems', dest='problems', default=','.join(sorted(HEURISTICS)),
+                      help='comma separated problem types in searchAgents.py [Default: %default]')
+    parser.add_option('-H', '--heuristics', dest='heuristics', default=','.join(sorted(set(sum(HEURISTICS.values(), [])))),
+                      help='comma separated heuristics, used where they apply [Default: %default]')
+    parser.add_option('-l', '--layouts', dest='layouts', default=None,
+                      help='comma separated layouts [Default: every layout in layouts/]')
+    parser.add_option('-n', '--repeat', dest='repeat', type='int', default=3,
+                      help='how many times each configuration is run [Default: %default]')
+    parser.add_option('--timeout', dest='timeout', type='int', default=10,
+                      help='seconds a single run may take before it is reported as a timeout [Default: %default]')
+    parser.add_option('--maxFood', dest='maxFood', type='int', default=30,
+                      help='largest number of dots for the problems that eat all the food [Default: %default]')
+    parser.add_option('-m', '--memory', dest='memory', action='store_true', default=False,
+                      help='also measure the peak bytes allocated, in an extra traced run')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='write the report to this .csv or .json file')
+    parser.add_option('-c', '--compare', dest='compare', default=None,
+                      help='rerun the configurations of this baseline report and flag regressions')
+    parser.add_option('-t', '--tolerance', dest='tolerance', type='float', default=0.25,
+                      help='relative slowdown allowed before a time regression is flagged [Default: %default]')
+
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+def runBenchmark(options):
+    "Runs the sweep (or the baseline's configurations) and returns the number of regressions"
+    if options.compare:
+        baseline = readReport(options.compare)
+        sweep = [(record['layout'], record['function'], record['problem'], record['heuristic']) for record in baseline]
+    else:
+        baseline = None
+        layouts = options.layouts.split(',') if options.layouts else layoutNames()
+        sweep = configurations(options.functions.split(','), options.problems.split(','),
+                               options.heuristics.split(','), layouts, options.maxFood)
+
+    records, regressed = [], 0
+    printRecord(dict((field, field) for field in FIELDS))
+    for i, configuration in enumerate(sweep):
+        record = run(*configuration, repeat=options.repeat, timeout=options.timeout, memory=options.memory)
+        records.append(record)
+        printRecord(record)
+        if baseline is not None:
+            for reason in regressions(baseline[i], record, options.tolerance):
+                print('  REGRESSION: ' + reason)
+                regressed += 1
+
+    if options.output:
+        writeReport(records, options.output)
+    if baseline is not None:
+        print('%d regression(s) in %d configurations' % (regressed, len(records)))
+    return regressed
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    sys.exit(1 if runBenchmark(options) else 0)
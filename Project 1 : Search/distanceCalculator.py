@@ -0,0 +1,257 @@
+# distanceCalculator.py
+# ---------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+This file contains a Distancer, which answers maze distance queries between
+any two free cells of a layout in constant time.
+
+The distances are computed once per layout (one breadth first search from
+every free cell) and shared by everyone who plays on the same walls:
+
+  distancer = getDistancer(gameState.getWalls(), gameState.data.layout)
+  distancer.getDistance((1, 1), (5, 3))
+
+When the layout is given, its table is also saved in the distanceCache
+directory, keyed by a hash of the layout text, and later processes map
+that file into memory instead of recomputing it.  To build the tables for
+every file in layouts/ (and drop those of layouts that changed), run
+
+  python distanceCalculator.py
+"""
+
+from array import array
+from collections import deque
+from game import Directions
+from util import nearestPoint
+import hashlib
+import mmap
+import os
+import struct
+import sys
+
+UNREACHABLE = 0xFFFF    # Table entry for two cells that are not connected
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'distanceCache')
+CACHE_MAGIC = b'PACDIST\0'
+CACHE_VERSION = 1       # Bump whenever the table layout or the cell numbering changes
+# magic, version, byte order mark, width, height, number of free cells, layout hash
+CACHE_HEADER = struct.Struct('=8sIHIII40s')
+
+class Distancer:
+    """
+    All-pairs maze distances for one walls Grid.
+
+    Free cells are numbered in column order and the distance from cell i to
+    cell j is stored at table[i * size + j] of a flat array of unsigned
+    shorts, so the whole table for a layout with n free cells takes 2n^2
+    bytes.
+    """
+
+    def __init__(self, walls, table=None):
+        self.width = walls.width
+        self.height = walls.height
+        self.cells = [(x, y) for x in range(walls.width) for y in range(walls.height) if not walls[x][y]]
+        self.index = dict((cell, i) for i, cell in enumerate(self.cells))
+        self.size = len(self.cells)
+
+        # Neighbour indices of every cell, in the same order as the successors of the search problems
+        self.neighbors = []
+        for x, y in self.cells:
+            self.neighbors.append([self.index[cell] for cell in [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)] if cell in self.index])
+
+        if table is not None:
+            self.table = table
+        else:
+            self.table = array('H', [UNREACHABLE]) * (self.size * self.size)
+            for source in range(self.size):
+                self._breadthFirstFill(source)
+
+    def _breadthFirstFill(self, source):
+        "Writes the distances from source to every cell into its row of the table"
+        table, neighbors = self.table, self.neighbors
+        offset = source * self.size
+        table[offset + source] = 0
+        frontier = deque([source])
+        while frontier:
+            cell = frontier.popleft()
+            distance = table[offset + cell] + 1
+            for neighbor in neighbors[cell]:
+                if table[offset + neighbor] == UNREACHABLE:
+                    table[offset + neighbor] = distance
+                    frontier.append(neighbor)
+
+    def _cellIndex(self, pos):
+        "Returns the index of the free cell at (or, between cells, nearest to) pos"
+        if pos in self.index:
+            return self.index[pos]
+        nearest = nearestPoint(pos)
+        if nearest not in self.index:
+            raise Exception('%s is not a free cell of the layout' % str(pos))
+        return self.index[nearest]
+
+    def getDistance(self, pos1, pos2):
+        """
+        Returns the maze distance between pos1 and pos2, or infinity if there
+        is no path between them.
+        """
+        index = self.index
+        if pos1 in index and pos2 in index:
+            distance = self.table[index[pos1] * self.size + index[pos2]]
+        else:
+            distance = self.table[self._cellIndex(pos1) * self.size + self._cellIndex(pos2)]
+        if distance == UNREACHABLE:
+            return float('inf')
+        return distance
+
+    def getPath(self, pos1, pos2):
+        """
+        Returns a shortest list of actions that leads from pos1 to pos2, or
+        None if there is no path between them.  Among the shortest paths,
+        North is preferred to South, East and West at every step.
+        """
+        source, target = self._cellIndex(pos1), self._cellIndex(pos2)
+        table, size = self.table, self.size
+        if table[source * size + target] == UNREACHABLE:
+            return None
+        path = []
+        while source != target:
+            distance = table[source * size + target]
+            for neighbor in self.neighbors[source]:
+                if table[neighbor * size + target] < distance:
+                    break
+            path.append(self._direction(self.cells[source], self.cells[neighbor]))
+            source = neighbor
+        return path
+
+    def _direction(self, cell, neighbor):
+        dx, dy = neighbor[0] - cell[0], neighbor[1] - cell[1]
+        if dy > 0: return Directions.NORTH
+        if dy < 0: return Directions.SOUTH
+        if dx > 0: return Directions.EAST
+        return Directions.WEST
+
+# Distancers already built, keyed by walls
+_DISTANCERS = {}
+_lastWalls, _lastDistancer = None, None
+
+def getDistancer(walls, layout=None):
+    """
+    Returns the Distancer for a walls Grid, building it the first time these
+    walls are seen.  Successive calls with the same Grid object skip hashing
+    the walls, so it is cheap to call from inside evaluation functions.
+
+    If the Layout the walls come from is given, the table is read from (or
+    saved to) the on-disk cache instead of being recomputed.
+    """
+    global _lastWalls, _lastDistancer
+    if walls is _lastWalls:
+        return _lastDistancer
+    distancer = _DISTANCERS.get(walls)
+    if distancer is None:
+        distancer = loadDistancer(walls, layout) if layout is not None else None
+        if distancer is None:
+            distancer = Distancer(walls)
+            if layout is not None:
+                saveDistancer(distancer, layout)
+        _DISTANCERS[walls.copy()] = distancer
+    _lastWalls, _lastDistancer = walls, distancer
+    return distancer
+
+def layoutHash(layout):
+    "Returns the hex digest that identifies a layout's text in the cache"
+    return hashlib.sha1('\n'.join(layout.layoutText).encode()).hexdigest()
+
+def cachePath(layout):
+    return os.path.join(CACHE_DIR, layoutHash(layout) + '.dist')
+
+def loadDistancer(walls, layout):
+    """
+    Maps the cached table of a layout into memory and returns a Distancer
+    that reads it in place, or None if there is no valid table for the
+    current text of the layout.
+
+    >>> import layout, shutil
+    >>> lay = layout.getLayout('testClassic')
+    >>> saveDistancer(Distancer(lay.walls), lay)
+    >>> list(loadDistancer(lay.walls, lay).table) == list(Distancer(lay.walls).table)
+    True
+
+    A table saved for another text of the layout is stale, even when it is
+    found under the name of the current text:
+
+    >>> edited = layout.Layout([line.replace('.', ' ') for line in lay.layoutText])
+    >>> path = shutil.copy(cachePath(lay), cachePath(edited))
+    >>> loadDistancer(edited.walls, edited) is None
+    True
+    >>> os.remove(path)
+    """
+    try:
+        with open(cachePath(layout), 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if len(data) < CACHE_HEADER.size:
+        return None
+    magic, version, byteOrder, width, height, size, digest = CACHE_HEADER.unpack_from(data)
+    if (magic, version, byteOrder) != (CACHE_MAGIC, CACHE_VERSION, 0x0102): return None
+    if digest.decode() != layoutHash(layout): return None
+    if (width, height) != (walls.width, walls.height): return None
+    if len(data) != CACHE_HEADER.size + 2 * size * size: return None
+    distancer = Distancer(walls, memoryview(data)[CACHE_HEADER.size:].cast('H'))
+    if distancer.size != size:
+        return None
+    return distancer
+
+def saveDistancer(distancer, layout):
+    """
+    Writes the table of a Distancer to the cache.  The file is written under
+    a temporary name and then renamed, so other processes never see half of
+    it.  Failing to write the cache is not an error.
+    """
+    path = cachePath(layout)
+    header = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, 0x0102, distancer.width, distancer.height,
+                               distancer.size, layoutHash(layout).encode())
+    temporary = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(temporary, 'wb') as f:
+            f.write(header)
+            f.write(distancer.table.tobytes())
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.exists(temporary): os.remove(temporary)
+
+def buildCache(layoutDir='layouts'):
+    """
+    Saves the table of every layout file in layoutDir and removes the tables
+    that no longer belong to any of them (old versions or edited layouts).
+    """
+    import layout as layouts
+    current = set()
+    for name in sorted(os.listdir(layoutDir)):
+        if not name.endswith('.lay'): continue
+        lay = layouts.tryToLoad(os.path.join(layoutDir, name))
+        path = cachePath(lay)
+        current.add(os.path.basename(path))
+        if loadDistancer(lay.walls, lay) is None:
+            saveDistancer(Distancer(lay.walls), lay)
+            print('Saved distances for %s' % name)
+    if os.path.isdir(CACHE_DIR):
+        for name in os.listdir(CACHE_DIR):
+            if name.endswith('.dist') and name not in current:
+                os.remove(os.path.join(CACHE_DIR, name))
+                print('Removed stale table %s' % name)
+
+if __name__ == '__main__':
+    buildCache(sys.argv[1] if len(sys.argv) > 1 else 'layouts')
@@ -14,6 +14,10 @@
 
 import search
 import random
+from npuzzle import NPuzzle
+
+# The packed states and move tables of the 3 x 3 puzzle
+PUZZLE = NPuzzle(3)
 
 # Module Classes
 
@@ -27,6 +31,8 @@ class EightPuzzleState:
     the EightPuzzleSearchProblem class.
     """
 
+    __slots__ = ['packed']
+
     def __init__( self, numbers ):
         """
           Constructs a new eight puzzle from an ordering of numbers.
@@ -46,18 +52,23 @@ class EightPuzzleState:
             | 6 | 7 | 8 |
             ------------
 
-        The configuration of the puzzle is stored in a 2-dimensional
-        list (a list of lists) 'cells'.
+        The configuration of the puzzle is packed into a single int,
+        'packed', a state of npuzzle.NPuzzle(3): the number on cell
+        row * 3 + col is in bits 4 * cell to 4 * cell + 3, and the cell of
+        the blank is in the bits above them.  'cells' (a list of lists) and
+        'blankLocation' are computed from it.
         """
-        self.cells = []
-        numbers = numbers[:] # Make a copy so as not to cause side-effects.
-        numbers.reverse()
-        for row in range( 3 ):
-            self.cells.append( [] )
-            for col in range( 3 ):
-                self.cells[row].append( numbers.pop() )
-                if self.cells[row][col] == 0:
-                    self.blankLocation = row, col
+        self.packed = PUZZLE.pack(numbers)
+
+    @property
+    def cells( self ):
+        "The numbers of the puzzle as a 2-dimensional list (a list of lists)"
+        numbers = PUZZLE.unpack(self.packed)
+        return [numbers[row * 3:row * 3 + 3] for row in range( 3 )]
+
+    @property
+    def blankLocation( self ):
+        return divmod(PUZZLE.blank(self.packed), 3)
 
     def isGoal( self ):
         """
@@ -77,13 +88,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).isGoal()
         False
         """
-        current = 0
-        for row in range( 3 ):
-            for col in range( 3 ):
-                if current != self.cells[row][col]:
-                    return False
-                current += 1
-        return True
+        return PUZZLE.isGoal(self.packed)
 
     def legalMoves( self ):
         """
@@ -95,17 +100,7 @@ class EightPuzzleState:
         >>> EightPuzzleState([0, 1, 2, 3, 4, 5, 6, 7, 8]).legalMoves()
         ['down', 'right']
         """
-        moves = []
-        row, col = self.blankLocation
-        if(row != 0):
-            moves.append('up')
-        if(row != 2):
-            moves.append('down')
-        if(col != 0):
-            moves.append('left')
-        if(col != 2):
-            moves.append('right')
-        return moves
+        return PUZZLE.legalMoves(self.packed)
 
     def result(self, move):
         """
@@ -113,36 +108,13 @@ class EightPuzzleState:
         updated based on the provided move.
 
         The move should be a string drawn from a list returned by legalMoves.
-        Illegal moves will raise an exception, which may be an array bounds
-        exception.
+        Illegal moves will raise an exception.
 
         NOTE: This function *does not* change the current object.  Instead,
         it returns a new object.
         """
-        row, col = self.blankLocation
-        if(move == 'up'):
-            newrow = row - 1
-            newcol = col
-        elif(move == 'down'):
-            newrow = row + 1
-            newcol = col
-        elif(move == 'left'):
-            newrow = row
-            newcol = col - 1
-        elif(move == 'right'):
-            newrow = row
-            newcol = col + 1
-        else:
-            raise "Illegal Move"
-
-        # Create a copy of the current eightPuzzle
-        newPuzzle = EightPuzzleState([0, 0, 0, 0, 0, 0, 0, 0, 0])
-        newPuzzle.cells = [values[:] for values in self.cells]
-        # And update it to reflect the move
-        newPuzzle.cells[row][col] = self.cells[newrow][newcol]
-        newPuzzle.cells[newrow][newcol] = self.cells[row][col]
-        newPuzzle.blankLocation = newrow, newcol
-
+        newPuzzle = EightPuzzleState.__new__(EightPuzzleState)
+        newPuzzle.packed = PUZZLE.result(self.packed, move)
         return newPuzzle
 
     # Utilities for comparison and display
@@ -155,13 +127,10 @@ class EightPuzzleState:
               EightPuzzleState([1, 0, 2, 3, 4, 5, 6, 7, 8]).result('left')
           True
         """
-        for row in range( 3 ):
-            if self.cells[row] != other.cells[row]:
-                return False
-        return True
+        return isinstance(other, EightPuzzleState) and self.packed == other.packed
 
     def __hash__(self):
-        return hash(str(self.cells))
+        return self.packed
 
     def __getAsciiString(self):
         """
@@ -196,7 +165,7 @@ class EightPuzzleSearchProblem(search.SearchProblem):
         self.puzzle = puzzle
 
     def getStartState(self):
-        return puzzle
+        return self.puzzle
 
     def isGoalState(self,state):
         return state.isGoal()
@@ -0,0 +1,415 @@
+# npuzzle.py
+# ----------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+The sliding tile puzzles of eightpuzzle.py in any size up to the 15-puzzle,
+solved optimally with IDA* and additive pattern databases.
+
+A state is a single integer: the tile on cell i (cells are numbered row by
+row) is in bits 4i to 4i+3, and the cell of the blank is in the four bits
+above the last cell.  The goal has the blank on cell 0 and tile i on cell i,
+like eightpuzzle.py, and the moves are the ones of the blank: 'up', 'down',
+'left' and 'right'.
+
+A pattern database holds, for every placement of a few of the tiles, the
+number of moves of those tiles needed to bring them home.  Moves of the
+other tiles are free, so the values of databases over disjoint tiles add up
+to an admissible heuristic.  The databases are built once (a breadth first
+search back from the goal) and saved in the patternCache directory; later
+processes map the files into memory instead of rebuilding them:
+
+  puzzle = NPuzzle(4)
+  start = puzzle.pack([14, 13, 15, 7, 11, 12, 9, 5, 6, 0, 2, 1, 4, 8, 10, 3])
+  actions = puzzle.solve(start)     # 57 moves, about ten seconds
+  problem = NPuzzleSearchProblem(puzzle, start)                  # or with any search function,
+  actions = search.idaStarSearch(problem, patternHeuristic)      # much more slowly
+
+To build the databases of the default partitions ahead of time, run
+
+  python npuzzle.py --build
+"""
+
+from collections import deque
+import mmap
+import os
+import random
+import struct
+import sys
+import time
+
+import search
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'patternCache')
+CACHE_MAGIC = b'PACPDB\0\0'
+CACHE_VERSION = 1       # Bump whenever the table layout or the indexing changes
+# magic, version, puzzle size, number of tiles in the pattern, the tiles
+CACHE_HEADER = struct.Struct('=8sIII16s')
+
+UNKNOWN = 0xFF          # Table entry for a placement the search has not reached
+
+# The tiles of the databases used by default, by puzzle size
+PARTITIONS = {
+    2: [(1, 2, 3)],
+    3: [(1, 2, 3, 4), (5, 6, 7, 8)],
+    4: [(1, 2, 3, 4), (5, 6, 7, 8), (9, 10, 11, 12), (13, 14, 15)],
+}
+
+MOVES = [('up', -1, 0), ('down', 1, 0), ('left', 0, -1), ('right', 0, 1)]
+
+class NPuzzle:
+    """
+    The mechanics of the size x size sliding tile puzzle on packed states.
+    The moves out of every cell of the blank are computed once.
+    """
+
+    def __init__(self, size=3):
+        if not 2 <= size <= 4:
+            raise Exception('Puzzles of size %d do not fit in 4 bits a tile' % size)
+        self.size = size
+        self.cells = size * size
+        self.blankShift = 4 * self.cells
+        self.tileMask = (1 << self.blankShift) - 1
+        self.goal = self.pack(list(range(self.cells)))
+
+        # (cell the blank moves to, move) for every cell of the blank
+        self.moves = []
+        for cell in range(self.cells):
+            row, col = divmod(cell, size)
+            self.moves.append([((row + dy) * size + col + dx, move) for move, dy, dx in MOVES
+                               if 0 <= row + dy < size and 0 <= col + dx < size])
+
+    def pack(self, numbers):
+        "Returns the state of a list of the tiles on each cell (0 for the blank)"
+        if sorted(numbers) != list(range(self.cells)):
+            raise Exception('Not a %d-puzzle: %s' % (self.cells - 1, numbers))
+        state = numbers.index(0) << self.blankShift
+        for cell, tile in enumerate(numbers):
+            state |= tile << (4 * cell)
+        return state
+
+    def unpack(self, state):
+        "Returns the list of the tiles on each cell of a state"
+        return [state >> (4 * cell) & 0xF for cell in range(self.cells)]
+
+    def blank(self, state):
+        return state >> self.blankShift
+
+    def isGoal(self, state):
+        return state == self.goal
+
+    def legalMoves(self, state):
+        return [move for cell, move in self.moves[self.blank(state)]]
+
+    def result(self, state, move):
+        "Returns the state after a move of the blank"
+        blank = self.blank(state)
+        for cell, legal in self.moves[blank]:
+            if legal == move:
+                tile = state >> (4 * cell) & 0xF
+                tiles = (state & self.tileMask) ^ tile << (4 * cell) ^ tile << (4 * blank)
+                return tiles | cell << self.blankShift
+        raise Exception('Illegal move %s' % move)
+
+    def successors(self, state):
+        "Returns (nextState, move) for every legal move of a state"
+        blank = self.blank(state)
+        tiles = state & self.tileMask
+        successors = []
+        for cell, move in self.moves[blank]:
+            tile = state >> (4 * cell) & 0xF
+            successors.append((tiles ^ tile << (4 * cell) ^ tile << (4 * blank) | cell << self.blankShift, move))
+        return successors
+
+    def isSolvable(self, state):
+        "Whether the goal can be reached from a state (half of the placements cannot)"
+        numbers = [tile for tile in self.unpack(state) if tile != 0]
+        inversions = sum(1 for i in range(len(numbers)) for j in range(i + 1, len(numbers)) if numbers[i] > numbers[j])
+        if self.size % 2 == 1:
+            return inversions % 2 == 0
+        return (inversions + self.blank(state) // self.size) % 2 == 0
+
+    def random(self, moves=100):
+        "Returns the state reached by moves random moves of the blank from the goal"
+        state = self.goal
+        for i in range(moves):
+            state = random.choice(self.successors(state))[0]
+        return state
+
+    def toString(self, state):
+        width = len(str(self.cells - 1))
+        horizontalLine = '-' * ((width + 3) * self.size + 1)
+        lines = [horizontalLine]
+        numbers = self.unpack(state)
+        for row in range(self.size):
+            rowLine = '|'
+            for tile in numbers[row * self.size:(row + 1) * self.size]:
+                rowLine += ' ' + (str(tile) if tile != 0 else '').rjust(width) + ' |'
+            lines.append(rowLine)
+            lines.append(horizontalLine)
+        return '\n'.join(lines)
+
+    def databases(self, partition=None):
+        "Returns the pattern databases of a partition of the tiles (PARTITIONS by default)"
+        return [getDatabase(self.size, pattern) for pattern in (partition or PARTITIONS[self.size])]
+
+    def solve(self, state, partition=None):
+        """
+        Returns an optimal list of moves from state to the goal, found by IDA*
+        with the pattern databases of a partition of the tiles, or None if the
+        state cannot be solved.
+
+        This is the same search as search.idaStarSearch with patternHeuristic,
+        specialised to the puzzle: the board is one list changed in place and
+        undone on the way back, a move only updates the index (and value) of
+        the database that owns the tile that slid, and the move that undoes
+        the previous one is never tried.  The number of nodes expanded is left
+        in self.expanded.
+        """
+        if not self.isSolvable(state):
+            return None
+        databases = self.databases(partition)
+        board = self.unpack(state)
+        location = [0] * self.cells         # Cell of every tile
+        for cell, tile in enumerate(board):
+            location[tile] = cell
+        owner, weight = [None] * self.cells, [0] * self.cells
+        for i, database in enumerate(databases):
+            for tile, w in zip(database.pattern, database.weights):
+                owner[tile], weight[tile] = i, w
+        tables = [database.table for database in databases]
+        indices = [database.index(location) for database in databases]
+        moves = self.moves
+        goal = list(range(self.cells))
+        path = []
+        self.expanded = 0
+
+        def search(blank, previous, cost, h, bound):
+            "Returns the lowest f cut off below this node, or -1 once the goal is found"
+            if h == 0 and board == goal:
+                return -1
+            self.expanded += 1
+            lowest = float('inf')
+            for cell, move in moves[blank]:
+                if cell == previous: continue
+                tile = board[cell]
+                i = owner[tile]
+                if i is None:
+                    nextH, index = h, None
+                else:
+                    table, index = tables[i], indices[i]
+                    nextIndex = index + (blank - cell) * weight[tile]
+                    nextH = h - table[index] + table[nextIndex]
+                f = cost + 1 + nextH
+                if f > bound:
+                    lowest = min(lowest, f)
+                    continue
+                board[blank], board[cell] = tile, 0
+                if index is not None: indices[i] = nextIndex
+                path.append(move)
+                t = search(cell, blank, cost + 1, nextH, bound)
+                if t < 0: return t
+                path.pop()
+                board[blank], board[cell] = 0, tile
+                if index is not None: indices[i] = index
+                lowest = min(lowest, t)
+            return lowest
+
+        h = sum(table[index] for table, index in zip(tables, indices))
+        bound = h
+        while True:
+            bound = search(board.index(0), None, 0, h, bound)
+            if bound < 0:
+                return path
+            if bound == float('inf'):
+                return None
+
+class PatternDatabase:
+    """
+    The moves of the tiles of pattern needed to bring them home, for every
+    placement of those tiles on a size x size puzzle.  The placement with
+    tile pattern[j] on cell c_j is at index sum(c_j * weights[j]), weights[j]
+    being cells ** j, so table has cells ** len(pattern) bytes (entries of
+    impossible placements, with two tiles on one cell, are never read).
+    """
+
+    def __init__(self, size, pattern, table):
+        self.size = size
+        self.pattern = tuple(pattern)
+        self.cells = size * size
+        self.weights = [self.cells ** j for j in range(len(pattern))]
+        self.table = table
+
+    def index(self, location):
+        "The index of a placement, given the cell of every tile"
+        return sum(location[tile] * weight for tile, weight in zip(self.pattern, self.weights))
+
+    def lookup(self, state):
+        "The value of a packed state"
+        index = 0
+        for cell in range(self.cells):
+            tile = state >> (4 * cell) & 0xF
+            if tile in self.pattern:
+                index += cell * self.weights[self.pattern.index(tile)]
+        return self.table[index]
+
+def buildDatabase(size, pattern):
+    """
+    Returns a new PatternDatabase, by a breadth first search back from the
+    goal over the placements of the pattern tiles and the blank, in which
+    sliding a pattern tile costs 1 and sliding any other tile is free (so
+    the search keeps the states of one cost at the front of its deque).  A
+    placement is worth the fewest moves over all the cells of the blank.
+    """
+    cells = size * size
+    weights = [cells ** j for j in range(len(pattern))]
+    moves = NPuzzle(size).moves
+    placements = cells ** len(pattern)
+    cost = bytearray([UNKNOWN]) * (placements * cells)      # By placement and cell of the blank
+    table = bytearray([UNKNOWN]) * placements
+
+    start = tuple(pattern)                  # The cell of every pattern tile: tile t is on cell t
+    startIndex = sum(cell * weight for cell, weight in zip(start, weights))
+    cost[startIndex * cells] = 0
+    frontier = deque([(start, startIndex, 0, 0)])
+    while frontier:
+        cellsOf, index, blank, moved = frontier.popleft()
+        if cost[index * cells + blank] < moved: continue    # Reached again more cheaply
+        if moved < table[index]:
+            table[index] = moved
+        for cell, _ in moves[blank]:
+            if cell in cellsOf:             # A pattern tile slides into the blank
+                j = cellsOf.index(cell)
+                nextCells = cellsOf[:j] + (blank,) + cellsOf[j + 1:]
+                nextIndex = index + (blank - cell) * weights[j]
+                nextMoved = moved + 1
+            else:
+                nextCells, nextIndex, nextMoved = cellsOf, index, moved
+            key = nextIndex * cells + cell
+            if nextMoved < cost[key]:
+                cost[key] = nextMoved
+                if nextMoved == moved:
+                    frontier.appendleft((nextCells, nextIndex, cell, nextMoved))
+                else:
+                    frontier.append((nextCells, nextIndex, cell, nextMoved))
+    return PatternDatabase(size, pattern, table)
+
+# Databases already loaded, keyed by (size, pattern)
+_DATABASES = {}
+
+def getDatabase(size, pattern):
+    """
+    Returns the PatternDatabase of some tiles, loading it from the cache or
+    building (and saving) it the first time it is asked for.
+    """
+    key = (size, tuple(pattern))
+    database = _DATABASES.get(key)
+    if database is None:
+        database = loadDatabase(size, pattern)
+        if database is None:
+            database = buildDatabase(size, pattern)
+            saveDatabase(database)
+        _DATABASES[key] = database
+    return database
+
+def cachePath(size, pattern):
+    return os.path.join(CACHE_DIR, '%d-%s.pdb' % (size, '-'.join(str(tile) for tile in pattern)))
+
+def cacheHeader(size, pattern):
+    return CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, size, len(pattern), bytes(pattern))
+
+def loadDatabase(size, pattern):
+    """
+    Maps the cached table of a pattern into memory and returns a
+    PatternDatabase that reads it in place, or None if there is no valid
+    table for it.
+    """
+    try:
+        with open(cachePath(size, pattern), 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    if data[:CACHE_HEADER.size] != cacheHeader(size, pattern): return None
+    if len(data) != CACHE_HEADER.size + (size * size) ** len(pattern): return None
+    return PatternDatabase(size, pattern, memoryview(data)[CACHE_HEADER.size:])
+
+def saveDatabase(database):
+    """
+    Writes the table of a PatternDatabase to the cache.  The file is written
+    under a temporary name and then renamed, so other processes never see
+    half of it.  Failing to write the cache is not an error.
+    """
+    path = cachePath(database.size, database.pattern)
+    temporary = '%s.%d.tmp' % (path, os.getpid())
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(temporary, 'wb') as f:
+            f.write(cacheHeader(database.size, database.pattern))
+            f.write(database.table)
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.exists(temporary): os.remove(temporary)
+
+class NPuzzleSearchProblem(search.SearchProblem):
+    """
+      A SearchProblem for an NPuzzle, whose states are the packed integers.
+    patternHeuristic reads the databases of the partition given here.
+    """
+    def __init__(self, puzzle, start, partition=None):
+        self.puzzle = puzzle
+        self.start = start
+        self.databases = puzzle.databases(partition)
+        self._expanded = 0
+
+    def getStartState(self):
+        return self.start
+
+    def isGoalState(self, state):
+        return self.puzzle.isGoal(state)
+
+    def getSuccessors(self, state):
+        "Returns (successor, move, 1) for every legal move of the blank"
+        self._expanded += 1
+        return [(successor, move, 1) for successor, move in self.puzzle.successors(state)]
+
+    def getCostOfActions(self, actions):
+        return len(actions)
+
+def patternHeuristic(state, problem: NPuzzleSearchProblem):
+    "The sum of the pattern databases of a problem; admissible since their tiles do not overlap"
+    return sum(database.lookup(state) for database in problem.databases)
+
+def buildAll():
+    "Builds (or checks) the databases of every default partition"
+    for size in sorted(PARTITIONS):
+        for pattern in PARTITIONS[size]:
+            started = time.time()
+            getDatabase(size, pattern)
+            print('%d-puzzle database %s ready in %.2f seconds' % (size * size - 1, pattern, time.time() - started))
+
+if __name__ == '__main__':
+    if '--build' in sys.argv:
+        buildAll()
+        sys.exit(0)
+    for size, moves in [(3, 100), (4, 60)]:
+        puzzle = NPuzzle(size)
+        start = puzzle.random(moves)
+        print('A random %d-puzzle:' % (puzzle.cells - 1))
+        print(puzzle.toString(start))
+        started = time.time()
+        puzzle.databases()
+        print('Pattern databases ready in %.2f seconds' % (time.time() - started))
+        started = time.time()
+        path = puzzle.solve(start)
+        print('IDA* found a path of %d moves in %.2f seconds (%d nodes expanded): %s' % (
+            len(path), time.time() - started, puzzle.expanded, ' '.join(path)))
@@ -17,6 +17,10 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import heapq
+import json
+import sys
+import time
 import util
 
 class SearchProblem:
@@ -62,6 +66,138 @@ class SearchProblem:
         util.raiseNotDefined()
 
 
+class SearchNodes:
+    """
+    A compact store for the search nodes generated by the algorithms below.
+
+    Every node is a record (parent, action, cost) kept in three parallel
+    lists and referred to by its index, so pushing a successor is O(1)
+    instead of copying the whole list of actions that leads to it.  The
+    action list itself is only rebuilt, by following the parent indices
+    back to the root, once a goal node has been found.
+
+    >>> nodes = SearchNodes()
+    >>> root = nodes.add(SearchNodes.ROOT, None, 0)
+    >>> north = nodes.add(root, 'North', 1)
+    >>> south, east = nodes.add(root, 'South', 1), nodes.add(north, 'East', 3)
+    >>> nodes.path(east), nodes.cost(east), nodes.path(south), nodes.path(root), len(nodes)
+    (['North', 'East'], 3, ['South'], [], 4)
+    """
+
+    ROOT = -1   # Parent index of the start node
+
+    def __init__(self):
+        self.parents = []
+        self.actions = []
+        self.costs = []
+
+    def add(self, parent, action, cost):
+        "Stores a new node and returns its index"
+        self.parents.append(parent)
+        self.actions.append(action)
+        self.costs.append(cost)
+        return len(self.parents) - 1
+
+    def cost(self, node):
+        "Returns the total cost of the path that leads to the node"
+        return self.costs[node]
+
+    def path(self, node):
+        "Returns the list of actions from the start node to the node"
+        Actions = []
+        while self.parents[node] != SearchNodes.ROOT:
+            Actions.append(self.actions[node])
+            node = self.parents[node]
+        Actions.reverse()
+        return Actions
+
+    def __len__(self):
+        return len(self.parents)
+
+
+class SearchStats:
+    """
+    What a search function did to find its path.  Every search function
+    below leaves one in problem.searchStats (the functions themselves still
+    return the plain list of actions the agents and the autograder expect):
+
+      generated       successors returned to the search
+      expanded        states whose successors were generated
+      duplicates      nodes dropped because their state had already been
+                      expanded or reached more cheaply
+      reopened        states expanded again after having been expanded
+      peakFrontier    most nodes waiting in the frontier at once
+      peakClosed      most states in the expanded (closed) set at once
+      successorTime   seconds spent generating successors
+      heuristicTime   seconds spent computing the heuristic
+      totalTime       seconds the whole search took
+
+    Numbers only some algorithms have (expansions per side, peak memory,
+    suboptimality bounds) go in the details dictionary.  Printing the stats
+    gives a table; toJSON() gives one line of JSON for logs.
+    """
+
+    FIELDS = ['algorithm', 'pathLength', 'generated', 'expanded', 'duplicates', 'reopened',
+              'peakFrontier', 'peakClosed', 'successorTime', 'heuristicTime', 'totalTime']
+
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+        self.pathLength = None
+        self.generated, self.expanded, self.duplicates, self.reopened = 0, 0, 0, 0
+        self.peakFrontier, self.peakClosed = 0, 0
+        self.successorTime, self.heuristicTime, self.totalTime = 0.0, 0.0, 0.0
+        self.details = {}
+        self.started = time.perf_counter()
+
+    def successors(self, getSuccessors):
+        "Wraps a successor function so that its calls are counted and timed"
+        def timedSuccessors(state):
+            started = time.perf_counter()
+            successors = getSuccessors(state)
+            self.successorTime += time.perf_counter() - started
+            self.expanded += 1
+            self.generated += len(successors)
+            return successors
+        return timedSuccessors
+
+    def heuristic(self, heuristic):
+        "Wraps a heuristic so that its calls are timed"
+        def timedHeuristic(state, problem=None):
+            started = time.perf_counter()
+            value = heuristic(state, problem)
+            self.heuristicTime += time.perf_counter() - started
+            return value
+        return timedHeuristic
+
+    def sizes(self, frontier, closed):
+        "Records the current sizes of the frontier and of the closed set"
+        if frontier > self.peakFrontier: self.peakFrontier = frontier
+        if closed > self.peakClosed: self.peakClosed = closed
+
+    def finish(self, problem, actions):
+        "Stops the clock, leaves the stats in problem.searchStats and returns actions"
+        self.totalTime = time.perf_counter() - self.started
+        self.pathLength = None if actions is None else len(actions)
+        problem.searchStats = self
+        return actions
+
+    def asDict(self):
+        Stats = dict((field, getattr(self, field)) for field in SearchStats.FIELDS)
+        Stats.update(self.details)
+        return Stats
+
+    def toJSON(self):
+        return json.dumps(self.asDict())
+
+    def __str__(self):
+        Rows = []
+        for key, value in self.asDict().items():
+            if isinstance(value, float):
+                value = '%.4f' % value
+            Rows.append((key, str(value)))
+        Width = max(len(key) for key, _ in Rows)
+        return '\n'.join('%s  %s' % (key.ljust(Width), value) for key, value in Rows)
+
 def tinyMazeSearch(problem):
     """
     Returns a sequence of moves that solves tinyMaze.  For any other maze, the
@@ -79,23 +215,29 @@ def depthFirstSearch(problem: SearchProblem):
 
     "*** YOUR CODE HERE ***"
     
+    Stats = SearchStats('depthFirstSearch')
+    getSuccessors = Stats.successors(problem.getSuccessors)
     Expanded = set()
+    Nodes = SearchNodes()                # Every node keeps only its parent and the action, not the whole path
     Frontier = util.Stack()              # For this algorithm we need a stack (Depth first)
-    Frontier.push((problem.getStartState(), []))     
+    Frontier.push((problem.getStartState(), Nodes.add(SearchNodes.ROOT, None, 0)))
 
     while not Frontier.isEmpty():        # Search all the Queue until it is empty
-        State, Actions = Frontier.pop()  # Pop it and save the data
+        State, Node = Frontier.pop()     # Pop it and save the data
 
         if problem.isGoalState(State):  # Found goal state? return the path list
-            return Actions
+            return Stats.finish(problem, Nodes.path(Node))
 
         if State not in Expanded:        # Visit the state (node) we are in in case we didnt before
             Expanded.add(State)
 
-            for state, action, _ in problem.getSuccessors(State):   # We dont need the cost for this algorithm 
-                Frontier.push((state, Actions + [action]))          # Total actions = all previous + the action we did right now
+            for state, action, _ in getSuccessors(State):   # We dont need the cost for this algorithm 
+                Frontier.push((state, Nodes.add(Node, action, 0)))  # The path is rebuilt from the parents only when we find the goal
+            Stats.sizes(len(Frontier.list), len(Expanded))
+        else:
+            Stats.duplicates += 1        # Popped again after it was expanded
 
-    return None       # Return failure
+    return Stats.finish(problem, None)  # Return failure
 
 def breadthFirstSearch(problem: SearchProblem):
     """
@@ -106,50 +248,69 @@ def breadthFirstSearch(problem: SearchProblem):
 
     # Same as DFS but for this algorithm we need a queue (Width first)
 
+    Stats = SearchStats('breadthFirstSearch')
+    getSuccessors = Stats.successors(problem.getSuccessors)
     Expanded = set()
+    Nodes = SearchNodes()
     Frontier = util.Queue()
-    Frontier.push((problem.getStartState(), []))
+    Frontier.push((problem.getStartState(), Nodes.add(SearchNodes.ROOT, None, 0)))
 
     while not Frontier.isEmpty():
-        State, Actions = Frontier.pop()
+        State, Node = Frontier.pop()
 
         if problem.isGoalState(State):
-            return Actions
+            return Stats.finish(problem, Nodes.path(Node))
 
         if State not in Expanded:
             Expanded.add(State)
 
-            for state, action, _ in problem.getSuccessors(State):            
-                Frontier.push((state, Actions + [action]))
+            for state, action, _ in getSuccessors(State):            
+                Frontier.push((state, Nodes.add(Node, action, 0)))
+            Stats.sizes(len(Frontier.list), len(Expanded))
+        else:
+            Stats.duplicates += 1
 
-    return None
+    return Stats.finish(problem, None)
 
-def uniformCostSearch(problem: SearchProblem):
+def uniformCostSearch(problem: SearchProblem, decreaseKey=False):
     """
     Search the node of least total cost first
+
+    With decreaseKey the frontier is an util.IndexedPriorityQueue that holds
+    every state at most once (see decreaseKeySearch).
     """
 
     "*** YOUR CODE HERE ***"
 
+    if decreaseKey:
+        return decreaseKeySearch(problem)
+
     # Same as DFS & BFS but for this algorithm we need a priority queue cause we need the cost of action
 
+    Stats = SearchStats('uniformCostSearch')
+    getSuccessors = Stats.successors(problem.getSuccessors)
     Expanded = set()
+    Nodes = SearchNodes()
     Frontier = util.PriorityQueue()      
-    Frontier.push((problem.getStartState(), [], 0), 0) 
+    Frontier.push((problem.getStartState(), Nodes.add(SearchNodes.ROOT, None, 0)), 0) 
 
     while not Frontier.isEmpty():
-        State, Actions, Cost = Frontier.pop()
+        State, Node = Frontier.pop()
 
         if problem.isGoalState(State):
-            return Actions
+            return Stats.finish(problem, Nodes.path(Node))
 
         if State not in Expanded:
             Expanded.add(State)
 
-            for state, action, cost in problem.getSuccessors(State):
-                Frontier.push((state, Actions + [action], Cost + cost), Cost + cost) # Priority is the total amount of cost so far
+            Cost = Nodes.cost(Node)
+            for state, action, cost in getSuccessors(State):
+                Frontier.push((state, Nodes.add(Node, action, Cost + cost)), Cost + cost) # Priority is the total amount of cost so far
+            Stats.sizes(len(Frontier.heap), len(Expanded))
+        else:
+            Stats.duplicates += 1
 
-    return None
+    return Stats.finish(problem, None)
 
 def nullHeuristic(state, problem=None):
     """
@@ -158,35 +319,867 @@ def nullHeuristic(state, problem=None):
     """
     return 0
 
-def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic):
+def aStarSearch(problem: SearchProblem, heuristic=nullHeuristic, decreaseKey=False):
     """
     Search the node that has the lowest combined cost and heuristic first.
+
+    With decreaseKey the frontier is an util.IndexedPriorityQueue that holds
+    every state at most once (see decreaseKeySearch).
     """
 
     "*** YOUR CODE HERE ***"
 
+    if decreaseKey:
+        return decreaseKeySearch(problem, heuristic)
+
     # Same as UCS but for this algorithm we need to add the heuristic cost
     
+    Stats = SearchStats('aStarSearch')
+    getSuccessors = Stats.successors(problem.getSuccessors)
+    heuristic = Stats.heuristic(heuristic)
     Expanded = set()
+    Nodes = SearchNodes()
     Frontier = util.PriorityQueue()      
-    Frontier.push((problem.getStartState(), [], 0), 0) 
+    Frontier.push((problem.getStartState(), Nodes.add(SearchNodes.ROOT, None, 0)), 0) 
+
+    while not Frontier.isEmpty():
+        State, Node = Frontier.pop()
+
+        if problem.isGoalState(State):
+            return Stats.finish(problem, Nodes.path(Node))
+
+        if State not in Expanded:
+            Expanded.add(State)
+
+            Cost = Nodes.cost(Node)
+            for state, action, cost in getSuccessors(State):
+                Frontier.push((state, Nodes.add(Node, action, Cost + cost)), Cost + cost + heuristic(state, problem))    # We also need the heuristic
+            Stats.sizes(len(Frontier.heap), len(Expanded))
+        else:
+            Stats.duplicates += 1
+
+    return Stats.finish(problem, None)
+
+def decreaseKeySearch(problem: SearchProblem, heuristic=nullHeuristic):
+    """
+    Search the node that has the lowest combined cost and heuristic first,
+    keeping each state in the frontier at most once.
+
+    When a cheaper path to a state that is still in the frontier is found,
+    its priority is lowered in place instead of pushing a duplicate, so the
+    frontier never grows past the number of distinct states generated.
+    States are expanded in the same order as aStarSearch.
+
+    >>> from batchSearch import startingState
+    >>> from searchAgents import PositionSearchProblem
+    >>> costFn = lambda pos: 2 ** pos[0]       # The costs of StayWestSearchAgent
+    >>> plain, indexed = [PositionSearchProblem(startingState('mediumScaryMaze'), costFn) for i in range(2)]
+    >>> aStarSearch(plain) == decreaseKeySearch(indexed), plain._expanded == indexed._expanded
+    (True, True)
+    >>> plain.searchStats.peakFrontier, indexed.searchStats.peakFrontier
+    (57, 12)
+    """
+
+    Stats = SearchStats('decreaseKeySearch')
+    getSuccessors = Stats.successors(problem.getSuccessors)
+    heuristic = Stats.heuristic(heuristic)
+    Expanded = set()
+    Nodes = SearchNodes()
+    Frontier = util.IndexedPriorityQueue()
+    Best = {}                           # Frontier state -> node of the cheapest path found to it
+    Start = problem.getStartState()
+    Best[Start] = Nodes.add(SearchNodes.ROOT, None, 0)
+    Frontier.push(Start, 0)
 
     while not Frontier.isEmpty():
-        State, Actions, Cost = Frontier.pop()
+        State = Frontier.pop()
+        Node = Best.pop(State)
 
         if problem.isGoalState(State):
-            return Actions
+            return Stats.finish(problem, Nodes.path(Node))
+
+        Expanded.add(State)
+
+        Cost = Nodes.cost(Node)
+        for state, action, cost in getSuccessors(State):
+            if state in Expanded:       # Never put an expanded state back in the frontier
+                Stats.duplicates += 1
+                continue
+            if Frontier.update(state, Cost + cost + heuristic(state, problem)):  # Pushed or decreased
+                Best[state] = Nodes.add(Node, action, Cost + cost)
+            else:
+                Stats.duplicates += 1
+        Stats.sizes(len(Frontier), len(Expanded))
+
+    return Stats.finish(problem, None)
+
+class ReversedProblem:
+    """
+    A single-goal search problem seen from its goal: the start and the goal
+    are swapped and the successors are the predecessors of the original
+    problem, so searching it runs backward.
+
+    Heuristics written for the original problem estimate the cost to
+    problem.goal, which on this view is the original start state, so they
+    can be passed the reversed problem unchanged.  Any other attribute is
+    read from the original problem.
+    """
+
+    def __init__(self, problem):
+        self.problem = problem
+        self.goal = problem.getStartState()
+
+    def getStartState(self):
+        return self.problem.getGoalState()
+
+    def getGoalState(self):
+        return self.goal
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def getSuccessors(self, state):
+        """
+        Returns the predecessors of state in the original problem.  Note that
+        the actions lead from each predecessor to state, not the other way.
+        """
+        return self.problem.getPredecessors(state)
+
+    def getPredecessors(self, state):
+        return self.problem.getSuccessors(state)
+
+    def __getattr__(self, name):
+        return getattr(self.problem, name)
+
+def weightedAStarSearch(problem: SearchProblem, heuristic=nullHeuristic, weight=2.0):
+    """
+    A* with the heuristic multiplied by weight: the nodes with the lowest
+    cost + weight * heuristic are searched first.  Leaning on the heuristic
+    reaches a goal after far fewer expansions, and with an admissible
+    heuristic the path costs at most weight times the optimal one.
+
+    >>> from batchSearch import startingState
+    >>> from searchAgents import PositionSearchProblem, manhattanHeuristic
+    >>> problem = PositionSearchProblem(startingState('openMaze'))     # aStarSearch finds 54 moves
+    >>> problem.getCostOfActions(weightedAStarSearch(problem, manhattanHeuristic))
+    60
+    >>> problem.searchStats.details['bounds']
+    [(60, 2.0)]
+    """
+
+    Stats = SearchStats('weightedAStarSearch')
+    getSuccessors = Stats.successors(problem.getSuccessors)
+    heuristic = Stats.heuristic(heuristic)
+    Expanded = set()
+    Nodes = SearchNodes()
+    Frontier = util.PriorityQueue()
+    Frontier.push((problem.getStartState(), Nodes.add(SearchNodes.ROOT, None, 0)), 0)
+
+    while not Frontier.isEmpty():
+        State, Node = Frontier.pop()
+
+        if problem.isGoalState(State):
+            Stats.details['bounds'] = [(Nodes.cost(Node), weight)]
+            return Stats.finish(problem, Nodes.path(Node))
 
         if State not in Expanded:
             Expanded.add(State)
 
-            for state, action, cost in problem.getSuccessors(State):
-                Frontier.push((state, Actions + [action], Cost + cost), Cost + cost + heuristic(state, problem))    # We also need the heuristic
+            Cost = Nodes.cost(Node)
+            for state, action, cost in getSuccessors(State):
+                Frontier.push((state, Nodes.add(Node, action, Cost + cost)), Cost + cost + weight * heuristic(state, problem))
+            Stats.sizes(len(Frontier.heap), len(Expanded))
+        else:
+            Stats.duplicates += 1
+
+    return Stats.finish(problem, None)
+
+def araStarSearch(problem: SearchProblem, heuristic=nullHeuristic, weight=3.0, weightStep=0.5, timeLimit=1.0):
+    """
+    Anytime repairing A* (ARA*): a weighted A* search that is repeated with
+    smaller and smaller weights, down to 1, for as long as timeLimit seconds
+    allow, and returns the best path found.
+
+    Each repetition reuses the costs found so far and only expands the
+    states whose cost went down since they were last expanded, so the path
+    keeps improving at a fraction of the cost of starting over.  After every
+    improvement the path cost and the bound on its suboptimality (the path
+    is at most bound times the optimal cost, for an admissible heuristic)
+    are appended to problem.searchStats.details['bounds'], which
+    SearchAgent prints.  The first path is always completed, however long
+    it takes.
+
+    Given the time, it ends with the optimal path and a bound of 1:
+
+    >>> from batchSearch import startingState
+    >>> from searchAgents import PositionSearchProblem, manhattanHeuristic
+    >>> problem = PositionSearchProblem(startingState('openMaze'))
+    >>> problem.getCostOfActions(araStarSearch(problem, manhattanHeuristic, timeLimit=60))
+    54
+    >>> [(cost, round(bound, 3)) for cost, bound in problem.searchStats.details['bounds']]
+    [(68, 1.259), (54, 1.0)]
+    """
+
+    Stats = SearchStats('araStarSearch')
+    getSuccessors = Stats.successors(problem.getSuccessors)
+    heuristic = Stats.heuristic(heuristic)
+    Deadline = time.time() + timeLimit
+    Start = problem.getStartState()
+    Nodes = SearchNodes()
+    Best = {Start: Nodes.add(SearchNodes.ROOT, None, 0)}    # State -> node of the cheapest path found to it
+    Heuristic = {Start: heuristic(Start, problem)}          # Computed once per state
+    Goal = None                         # Node of the best path found so far
+    Frontier = util.PriorityQueue()
+    Frontier.push(Start, weight * Heuristic[Start])
+    Inconsistent = set()                # States that got cheaper after being expanded in this repetition
+    Ever = set()                        # States expanded in any repetition
+    Bounds = Stats.details['bounds'] = []
+
+    while True:
+        Closed = set()
+        while not Frontier.isEmpty():   # Weighted A* from the frontier, until no node can beat the goal
+            if Goal is not None and (Frontier.heap[0][0] >= Nodes.cost(Goal) or time.time() > Deadline):
+                break
+            State = Frontier.pop()
+            if State in Closed:
+                Stats.duplicates += 1
+                continue
+            Closed.add(State)
+            if State in Ever:
+                Stats.reopened += 1
+            Ever.add(State)
+            Node = Best[State]
+
+            if problem.isGoalState(State):
+                if Goal is None or Nodes.cost(Node) < Nodes.cost(Goal):
+                    Goal = Node
+                continue
+
+            Cost = Nodes.cost(Node)
+            for state, action, cost in getSuccessors(State):
+                if state in Best and Nodes.cost(Best[state]) <= Cost + cost:
+                    Stats.duplicates += 1
+                    continue
+                Best[state] = Nodes.add(Node, action, Cost + cost)
+                if state not in Heuristic:
+                    Heuristic[state] = heuristic(state, problem)
+                if state in Closed:
+                    Inconsistent.add(state)
+                else:
+                    Frontier.push(state, Cost + cost + weight * Heuristic[state])
+            Stats.sizes(len(Frontier.heap), len(Closed))
+
+        if Goal is None:
+            return Stats.finish(problem, None)
+
+        # The optimal cost is at least the lowest cost + heuristic of any state still waiting to be expanded
+        Waiting = set(state for _, _, state in Frontier.heap if state not in Closed) | Inconsistent
+        LowerBound = min([Nodes.cost(Best[state]) + Heuristic[state] for state in Waiting] + [Nodes.cost(Goal)])
+        Bound = min(weight, Nodes.cost(Goal) / LowerBound) if LowerBound > 0 else weight
+        if not Bounds or Bounds[-1] != (Nodes.cost(Goal), Bound):
+            Bounds.append((Nodes.cost(Goal), Bound))
+
+        if Bound <= 1 or time.time() > Deadline:
+            return Stats.finish(problem, Nodes.path(Goal))
+
+        # Search again with a smaller weight from every state that is waiting or got cheaper
+        weight = max(1.0, weight - weightStep)
+        Frontier = util.PriorityQueue()
+        for state in Waiting:
+            Frontier.push(state, Nodes.cost(Best[state]) + weight * Heuristic[state])
+        Inconsistent = set()
+
+def jumpPointSearch(problem: SearchProblem, heuristic=nullHeuristic):
+    """
+    A* over jump points (JPS) for problems whose states are the free cells
+    of problem.walls and whose steps, to the four neighbouring cells, all
+    cost 1, such as PositionSearchProblem and AnyFoodSearchProblem.
+
+    Instead of stepping one cell at a time, the search scans along straight
+    lines and only stops at jump points, where a shortest path may have to
+    turn.  Among equally short paths it only follows those that go vertically
+    first and turn to a vertical move only where a wall behind forces it:
+      - a horizontal scan stops at a goal or at a cell with a free cell
+        above (or below) it while the cell before it has a wall there;
+      - a vertical scan stops at a goal or at a cell from which a horizontal
+        scan to either side finds a jump point.
+    The cells in between are never expanded, so far fewer nodes are
+    expanded than by aStarSearch, for the same path cost.  Every jump point
+    expanded counts as one expansion in problem._expanded, and the cells
+    scanned on the way are counted in problem.searchStats.details.
+
+    >>> from batchSearch import startingState
+    >>> from searchAgents import PositionSearchProblem, AnyFoodSearchProblem, manhattanHeuristic
+    >>> for layoutName in ['mediumMaze', 'bigMaze', 'openMaze']:
+    ...     problem = PositionSearchProblem(startingState(layoutName))
+    ...     print(layoutName, problem.getCostOfActions(jumpPointSearch(problem, manhattanHeuristic)))
+    mediumMaze 68
+    bigMaze 210
+    openMaze 54
+    >>> for layoutName in ['mediumCorners', 'bigCorners', 'mediumScaryMaze']:
+    ...     problem = AnyFoodSearchProblem(startingState(layoutName))
+    ...     print(layoutName, len(jumpPointSearch(problem)), len(breadthFirstSearch(problem)))
+    mediumCorners 18 18
+    bigCorners 30 30
+    mediumScaryMaze 72 72
+    """
+    from game import Directions
+
+    Stats = SearchStats('jumpPointSearch')
+    heuristic = Stats.heuristic(heuristic)
+    Stats.details['scanned'] = 0
+
+    walls = problem.walls
+    isGoal = problem.isGoalState
+
+    def jumpHorizontally(x, y, dx):
+        "Returns the first jump point scanning from (x, y) along dx, or None if a wall comes first"
+        while True:
+            x += dx
+            Stats.details['scanned'] += 1
+            if walls[x][y]: return None
+            if isGoal((x, y)): return (x, y)
+            if not walls[x][y + 1] and walls[x - dx][y + 1]: return (x, y)  # Forced to turn north
+            if not walls[x][y - 1] and walls[x - dx][y - 1]: return (x, y)  # Forced to turn south
+
+    def jumpVertically(x, y, dy):
+        "Returns the first jump point scanning from (x, y) along dy, or None if a wall comes first"
+        while True:
+            y += dy
+            Stats.details['scanned'] += 1
+            if walls[x][y]: return None
+            if isGoal((x, y)): return (x, y)
+            if jumpHorizontally(x, y, 1) is not None or jumpHorizontally(x, y, -1) is not None:
+                return (x, y)
+
+    def directions(x, y, dx, dy):
+        "The (dx, dy) directions worth scanning from a jump point reached along (dx, dy)"
+        if (dx, dy) == (0, 0):          # The start: every direction
+            return [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        if dy != 0:                     # Vertical: straight on and both sides
+            return [(0, dy), (1, 0), (-1, 0)]
+        Scans = [(dx, 0)]               # Horizontal: straight on and the forced turns
+        for dy in [1, -1]:
+            if not walls[x][y + dy] and walls[x - dx][y + dy]:
+                Scans.append((0, dy))
+        return Scans
+
+    Names = {(0, 1): Directions.NORTH, (0, -1): Directions.SOUTH, (1, 0): Directions.EAST, (-1, 0): Directions.WEST}
+    Expanded = set()
+    Nodes = SearchNodes()               # The action of a node is the list of moves from its parent
+    Frontier = util.PriorityQueue()
+    Start = problem.getStartState()
+    Frontier.push((Start, (0, 0), Nodes.add(SearchNodes.ROOT, [], 0)), heuristic(Start, problem))
+
+    while not Frontier.isEmpty():
+        State, Direction, Node = Frontier.pop()
+
+        if isGoal(State):
+            return Stats.finish(problem, [action for segment in Nodes.path(Node) for action in segment])
+
+        if State not in Expanded:
+            Expanded.add(State)
+            if hasattr(problem, '_expanded'): problem._expanded += 1
+            Stats.expanded += 1
+
+            x, y = State
+            Cost = Nodes.cost(Node)
+            started = time.perf_counter()
+            for dx, dy in directions(x, y, *Direction):
+                if dx != 0:
+                    point = jumpHorizontally(x, y, dx)
+                else:
+                    point = jumpVertically(x, y, dy)
+                if point is None:
+                    continue
+                Stats.generated += 1
+                if point in Expanded:
+                    Stats.duplicates += 1
+                    continue
+                steps = abs(point[0] - x) + abs(point[1] - y)
+                Frontier.push((point, (dx, dy), Nodes.add(Node, [Names[(dx, dy)]] * steps, Cost + steps)),
+                              Cost + steps + heuristic(point, problem))
+            Stats.successorTime += time.perf_counter() - started
+            Stats.sizes(len(Frontier.heap), len(Expanded))
+        else:
+            Stats.duplicates += 1
+
+    return Stats.finish(problem, None)
+
+def bidirectionalPath(Forward, ForwardNode, Backward, BackwardNode):
+    "Joins the forward path to a meeting state with the backward path from it to the goal"
+    Actions = Forward.path(ForwardNode)
+    Actions.extend(reversed(Backward.path(BackwardNode)))   # Backward actions were stored goal first
+    return Actions
+
+def bidirectionalBreadthFirstSearch(problem: SearchProblem):
+    """
+    Search from the start and the goal at the same time, one whole layer of
+    the smaller frontier at a time, until the two searches meet.
+
+    The problem must have a single goal, returned by problem.getGoalState(),
+    and a problem.getPredecessors(state) that returns (predecessor, action,
+    stepCost) triples, where action leads from predecessor to state.  Step
+    costs are ignored, as in breadthFirstSearch, and the path returned has
+    the fewest possible actions.
+
+    The number of states expanded by each side is left in the
+    expandedForward and expandedBackward details of problem.searchStats.
+
+    >>> from batchSearch import startingState
+    >>> from searchAgents import PositionSearchProblem
+    >>> problem = PositionSearchProblem(startingState('mediumMaze'))
+    >>> len(bidirectionalBreadthFirstSearch(problem)) == len(breadthFirstSearch(problem)) == 68
+    True
+    """
+
+    Stats = SearchStats('bidirectionalBreadthFirstSearch')
+    Start, Goal = problem.getStartState(), problem.getGoalState()
+    Stats.details['expandedForward'], Stats.details['expandedBackward'] = 0, 0
+    if Start == Goal:
+        return Stats.finish(problem, [])
+
+    Nodes = (SearchNodes(), SearchNodes())                  # Forward and backward search trees
+    Reached = ({Start: Nodes[0].add(SearchNodes.ROOT, None, 0)}, {Goal: Nodes[1].add(SearchNodes.ROOT, None, 0)})
+    Layers = [[Start], [Goal]]
+    Expand = (Stats.successors(problem.getSuccessors), Stats.successors(problem.getPredecessors))
+    Expanded = [0, 0]
+
+    while Layers[0] and Layers[1]:
+        side = 0 if len(Layers[0]) <= len(Layers[1]) else 1 # Grow the smaller frontier
+        Mine, Other = Reached[side], Reached[1 - side]
+        Meeting, Length = None, None
+        Layer = []
+
+        for State in Layers[side]:
+            Expanded[side] += 1
+            Node = Mine[State]
+            Depth = Nodes[side].cost(Node) + 1
+            for state, action, _ in Expand[side](State):
+                if state in Mine:
+                    Stats.duplicates += 1
+                    continue
+                Mine[state] = Nodes[side].add(Node, action, Depth)
+                Layer.append(state)
+                if state in Other:                          # The two searches meet here
+                    length = Depth + Nodes[1 - side].cost(Other[state])
+                    if Length is None or length < Length:   # Finish the layer, a later meeting can be shorter
+                        Meeting, Length = state, length
+
+        Layers[side] = Layer
+        Stats.sizes(len(Layers[0]) + len(Layers[1]), len(Reached[0]) + len(Reached[1]) - len(Layers[0]) - len(Layers[1]))
+        Stats.details['expandedForward'], Stats.details['expandedBackward'] = Expanded
+        if Meeting is not None:
+            return Stats.finish(problem, bidirectionalPath(Nodes[0], Reached[0][Meeting], Nodes[1], Reached[1][Meeting]))
+
+    return Stats.finish(problem, None)
+
+def bidirectionalAStarSearch(problem: SearchProblem, heuristic=nullHeuristic):
+    """
+    Run aStarSearch from the start and, on the ReversedProblem, from the goal,
+    always expanding the side with the smaller frontier.
+
+    The problem must supply getGoalState and getPredecessors, as for
+    bidirectionalBreadthFirstSearch.  The heuristic estimates the cost to
+    the goal going forward and, evaluated on the reversed problem, the cost
+    from the start going backward.  Every time one side generates a state
+    the other side has reached, the path through it is a candidate; the
+    search stops once the lowest f value of either frontier is no less than
+    the cheapest candidate, which is then optimal for a consistent
+    heuristic.
+
+    The number of states expanded by each side is left in the
+    expandedForward and expandedBackward details of problem.searchStats.
+
+    The path is as short as the one aStarSearch finds:
+
+    >>> from batchSearch import startingState
+    >>> from searchAgents import PositionSearchProblem, manhattanHeuristic
+    >>> for layoutName in ['mediumMaze', 'bigMaze', 'openMaze']:
+    ...     problem = PositionSearchProblem(startingState(layoutName))
+    ...     actions = bidirectionalAStarSearch(problem, manhattanHeuristic)
+    ...     print(layoutName, problem.getCostOfActions(actions), problem.getCostOfActions(aStarSearch(problem, manhattanHeuristic)))
+    mediumMaze 68 68
+    bigMaze 210 210
+    openMaze 54 54
+    """
+
+    Stats = SearchStats('bidirectionalAStarSearch')
+    heuristic = Stats.heuristic(heuristic)
+    Start, Goal = problem.getStartState(), problem.getGoalState()
+    Stats.details['expandedForward'], Stats.details['expandedBackward'] = 0, 0
+    if Start == Goal:
+        return Stats.finish(problem, [])
+
+    Problems = (problem, ReversedProblem(problem))
+    Expand = (Stats.successors(problem.getSuccessors), Stats.successors(problem.getPredecessors))
+    Nodes = (SearchNodes(), SearchNodes())
+    Frontiers = (util.PriorityQueue(), util.PriorityQueue())
+    Best = ({}, {})                     # State -> node of the cheapest path found to it, per side
+    Expanded = (set(), set())
+    for side, State in enumerate([Start, Goal]):
+        Best[side][State] = Nodes[side].add(SearchNodes.ROOT, None, 0)
+        Frontiers[side].push((State, Best[side][State]), heuristic(State, Problems[side]))
+
+    Meeting, Mu = None, float('inf')    # Cheapest state where the searches met and the cost through it
+
+    while not Frontiers[0].isEmpty() and not Frontiers[1].isEmpty():
+        if Frontiers[0].heap[0][0] >= Mu or Frontiers[1].heap[0][0] >= Mu:
+            break                       # No path through either frontier can be cheaper
+
+        side = 0 if len(Frontiers[0].heap) <= len(Frontiers[1].heap) else 1
+        Mine, Other = Best[side], Best[1 - side]
+        State, Node = Frontiers[side].pop()
+        if State in Expanded[side]:
+            Stats.duplicates += 1
+            continue
+        Expanded[side].add(State)
+
+        Cost = Nodes[side].cost(Node)
+        for state, action, cost in Expand[side](State):
+            if state in Expanded[side]:
+                Stats.duplicates += 1
+                continue
+            if state in Mine and Nodes[side].cost(Mine[state]) <= Cost + cost:
+                Stats.duplicates += 1   # Not cheaper than the path we already have
+                continue
+            Mine[state] = Nodes[side].add(Node, action, Cost + cost)
+            Frontiers[side].push((state, Mine[state]), Cost + cost + heuristic(state, Problems[side]))
+            if state in Other and Cost + cost + Nodes[1 - side].cost(Other[state]) < Mu:
+                Meeting, Mu = state, Cost + cost + Nodes[1 - side].cost(Other[state])
+        Stats.sizes(len(Frontiers[0].heap) + len(Frontiers[1].heap), len(Expanded[0]) + len(Expanded[1]))
+
+    Stats.details['expandedForward'], Stats.details['expandedBackward'] = len(Expanded[0]), len(Expanded[1])
+    if Meeting is None:
+        return Stats.finish(problem, None)
+    return Stats.finish(problem, bidirectionalPath(Nodes[0], Best[0][Meeting], Nodes[1], Best[1][Meeting]))
+
+def estimateBytes(obj):
+    """
+    Roughly how many bytes obj takes, counting what it refers to through
+    tuples, lists, sets, dicts and instance attributes (so a food Grid is
+    counted with its columns).  Objects reached twice are counted once.
+    """
+    Seen = set()
+    Total = 0
+    Stack = [obj]
+    while Stack:
+        obj = Stack.pop()
+        if id(obj) in Seen:
+            continue
+        Seen.add(id(obj))
+        Total += sys.getsizeof(obj)
+        if isinstance(obj, (tuple, list, set, frozenset)):
+            Stack.extend(obj)
+        elif isinstance(obj, dict):
+            Stack.extend(obj.keys())
+            Stack.extend(obj.values())
+        elif hasattr(obj, '__dict__') and not isinstance(obj, type):
+            Stack.append(vars(obj))
+    return Total
+
+def memoryBudget(maxNodes, maxBytes, nodeBytes):
+    "The number of nodes allowed by a node budget and a byte budget, None meaning unbounded"
+    Budget = None if maxNodes is None else int(maxNodes)
+    if maxBytes is not None:
+        Budget = min(Budget or sys.maxsize, max(1, int(maxBytes) // nodeBytes))
+    return Budget
+
+def idaStarSearch(problem: SearchProblem, heuristic=nullHeuristic, maxNodes=None, maxBytes=None):
+    """
+    Iterative deepening A*: repeated depth first searches that cut off every
+    node whose f = cost + heuristic exceeds a bound, starting with the
+    heuristic of the start state and raising the bound to the lowest f that
+    was cut off, until a goal is reached.  The path is optimal for an
+    admissible heuristic.
+
+    Only the current path and the successors waiting on it are kept, so
+    memory grows with the depth of the solution rather than with the number
+    of states.  States already on the current path are not revisited, but
+    other repeated states are (there is no Expanded set).
+
+    maxNodes and maxBytes bound the number of nodes (or the estimated bytes
+    they take) held at once.  If it would need more, the search gives up
+    and returns an empty path, with the reason in the gaveUp detail of
+    problem.searchStats.  The peak is left in the peakNodes and peakBytes
+    details; reopened counts the states expanded again in later iterations.
+
+    >>> from batchSearch import startingState
+    >>> from searchAgents import PositionSearchProblem, manhattanHeuristic
+    >>> for layoutName in ['mediumMaze', 'bigMaze']:
+    ...     problem = PositionSearchProblem(startingState(layoutName))
+    ...     print(layoutName, problem.getCostOfActions(idaStarSearch(problem, manhattanHeuristic)))
+    mediumMaze 68
+    bigMaze 210
+    >>> problem = PositionSearchProblem(startingState('mediumMaze'))
+    >>> idaStarSearch(problem, manhattanHeuristic, maxNodes=20)
+    []
+    >>> problem.searchStats.details['gaveUp']
+    'a path of depth 20 needs more than 20 nodes'
+    """
+
+    Stats = SearchStats('idaStarSearch')
+    getSuccessors = Stats.successors(problem.getSuccessors)
+    heuristic = Stats.heuristic(heuristic)
+    Start = problem.getStartState()
+    NodeBytes = estimateBytes((Start, None, 0)) + sys.getsizeof([])   # A waiting successor and its share of a list
+    Budget = memoryBudget(maxNodes, maxBytes, NodeBytes)
+    Peak = 1
+    Bound = heuristic(Start, problem)
+    Ever = set()                        # States expanded in earlier iterations
+
+    while True:
+        NextBound = float('inf')        # Lowest f cut off in this iteration
+        Path = [Start]                  # States on the current path
+        OnPath = {Start}
+        Actions = []
+        Costs = [0]
+        Waiting = [None]                # Successors left to try at every depth (None: not expanded yet)
+        Held = 1                        # Nodes held: the path and the waiting successors
+        Seen = set()                    # States expanded in this iteration
+
+        while Path:
+            State, Cost = Path[-1], Costs[-1]
+            if Waiting[-1] is None:
+                f = Cost + heuristic(State, problem)
+                if f > Bound:
+                    NextBound = min(NextBound, f)
+                    Waiting[-1] = []
+                elif problem.isGoalState(State):
+                    Stats.details['peakNodes'], Stats.details['peakBytes'] = Peak, Peak * NodeBytes
+                    return Stats.finish(problem, Actions)
+                else:
+                    if State in Ever and State not in Seen:
+                        Stats.reopened += 1
+                    elif State in Seen:
+                        Stats.duplicates += 1   # Reached again along another path
+                    Seen.add(State)
+                    Successors = [successor for successor in getSuccessors(State) if successor[0] not in OnPath]
+                    if Budget is not None and Held + len(Successors) > Budget:     # Checked before they are held
+                        Stats.details['gaveUp'] = 'a path of depth %d needs more than %d nodes' % (len(Path), Budget)
+                        Stats.details['peakNodes'], Stats.details['peakBytes'] = Peak, Peak * NodeBytes
+                        return Stats.finish(problem, [])
+                    Successors.reverse()        # Pop them in the order they were returned
+                    Waiting[-1] = Successors
+                    Held += len(Successors)
+                    Peak = max(Peak, Held)
+                    Stats.sizes(Held - len(Path), len(Path))
+
+            if Waiting[-1]:             # Go one level deeper
+                state, action, cost = Waiting[-1].pop()
+                Path.append(state)
+                OnPath.add(state)
+                Actions.append(action)
+                Costs.append(Cost + cost)
+                Waiting.append(None)
+            else:                       # Every successor was tried, back up
+                OnPath.discard(Path.pop())
+                Waiting.pop()
+                Costs.pop()
+                Held -= 1
+                if Actions:
+                    Actions.pop()
+
+        if NextBound == float('inf'):   # Nothing was cut off, so there is no goal
+            Stats.details['peakNodes'], Stats.details['peakBytes'] = Peak, Peak * NodeBytes
+            return Stats.finish(problem, None)
+        Bound = NextBound
+        Ever |= Seen
+
+class BoundedNode:
+    "A node of smaStarSearch's search tree, kept in memory with its children"
+
+    def __init__(self, state, parent, action, cost, f):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.cost = cost
+        self.depth = 0 if parent is None else parent.depth + 1
+        self.f = f
+        self.priority = f               # Its f in the frontier, raised by what was forgotten below it
+        self.forgotten = float('inf')   # Lowest priority among the children dropped from memory
+        self.children = []
+        self.version = 0                # Bumped to invalidate its old entries in the frontier heaps
+
+    def path(self):
+        Actions = []
+        node = self
+        while node.parent is not None:
+            Actions.append(node.action)
+            node = node.parent
+        Actions.reverse()
+        return Actions
+
+def smaStarSearch(problem: SearchProblem, heuristic=nullHeuristic, maxNodes=100000, maxBytes=None):
+    """
+    Simplified memory-bounded A* (SMA*): A* on the search tree that keeps at
+    most maxNodes nodes (or about maxBytes bytes of them) in memory.
+
+    Room is made before the children of an expanded node go into memory,
+    so it never holds more than the budget: the leaf with the highest f
+    (the shallowest one on ties) is forgotten, or the child with the highest
+    f is left out when it is worse than every leaf.  Either way its parent
+    remembers the lowest f among the children it lost, and goes back into
+    the frontier with that f, so the forgotten children are regenerated
+    only once every cheaper alternative has been tried.  Children take the
+    f of their parent when it is higher than their own (pathmax), and an
+    infinite f when they are too deep for their path and a successor to fit
+    in memory.
+
+    A child is not generated when a node for the same state with a cost no
+    higher is already in memory, so paths that reach a cell through another
+    branch do not compete for the budget.  Forgotten nodes still have to be
+    regenerated, though, and that is slow in Python: once the budget is well
+    below what A* keeps it takes seconds where A* takes milliseconds (the
+    corners of mediumCorners take about a second in 150 nodes, and more
+    than a minute in 60).
+
+    The path is optimal whenever the best solution fits in the budget;
+    otherwise the search gives up and returns an empty path, with the
+    reason in the gaveUp detail of problem.searchStats.  The peak is left
+    in the peakNodes and peakBytes details; reopened counts the nodes
+    regenerated after being forgotten.
+
+    >>> from batchSearch import startingState
+    >>> from searchAgents import PositionSearchProblem, manhattanHeuristic, CornersProblem, cornersHeuristic
+    >>> problem = PositionSearchProblem(startingState('bigMaze'))
+    >>> problem.getCostOfActions(smaStarSearch(problem, manhattanHeuristic, maxNodes=300))
+    210
+    >>> problem.searchStats.details['peakNodes'] <= 300
+    True
+    >>> problem = PositionSearchProblem(startingState('mediumMaze'))
+    >>> problem.getCostOfActions(smaStarSearch(problem, manhattanHeuristic, maxNodes=None, maxBytes=100000))
+    68
+    >>> problem.searchStats.details['peakBytes'] <= 100000
+    True
+    >>> problem = CornersProblem(startingState('mediumCorners'))
+    >>> problem.getCostOfActions(smaStarSearch(problem, cornersHeuristic, maxNodes=1000))
+    106
+
+    The 68 moves through mediumMaze need 69 nodes in memory:
+
+    >>> problem = PositionSearchProblem(startingState('mediumMaze'))
+    >>> smaStarSearch(problem, manhattanHeuristic, maxNodes=60)
+    []
+    >>> problem.searchStats.details['gaveUp']
+    '60 nodes are not enough for this problem'
+    """
+
+    Stats = SearchStats('smaStarSearch')
+    getSuccessors = Stats.successors(problem.getSuccessors)
+    heuristic = Stats.heuristic(heuristic)
+    Start = problem.getStartState()
+    Root = BoundedNode(Start, None, None, 0, heuristic(Start, problem))
+    NodeBytes = estimateBytes(Root)
+    Budget = memoryBudget(maxNodes, maxBytes, NodeBytes) or sys.maxsize
+    Used, Peak = 1, 1
+    Cut = False                         # Whether a child was too deep to fit in memory
+    BestCost = {Start: Root}            # The cheapest node of every state in memory
+
+    # The frontier in two heaps: lowest priority and deepest first, highest priority and shallowest first
+    Best, Worst = [], []
+    count = 0
+    def push(node, priority):
+        nonlocal count
+        node.priority = priority
+        node.version += 1
+        heapq.heappush(Best, (priority, -node.depth, count, node.version, node))
+        heapq.heappush(Worst, (-priority, node.depth, count, node.version, node))
+        count += 1
+    def popBest():
+        while Best:
+            _, _, _, version, node = heapq.heappop(Best)
+            if version == node.version:
+                node.version += 1       # Also drop its entry in the other heap
+                return node
+        return None
+    def popWorstLeaf():
+        "Removes the leaf to forget; frontier nodes with children in memory are skipped"
+        while Worst:
+            _, _, _, version, node = heapq.heappop(Worst)
+            if version == node.version and not node.children:
+                node.version += 1
+                return node
+        return None
+    def forget(leaf):
+        "Drops a leaf from memory and puts its parent back in the frontier"
+        parent = leaf.parent
+        parent.children.remove(leaf)
+        if BestCost.get(leaf.state) is leaf:
+            del BestCost[leaf.state]
+        parent.forgotten = min(parent.forgotten, leaf.priority)
+        push(parent, max(parent.f, parent.forgotten))
+    push(Root, Root.f)
+
+    while True:
+        Node = popBest()
+        if Node is None or Node.priority == float('inf'):
+            break
+        if problem.isGoalState(Node.state):
+            Stats.details['peakNodes'], Stats.details['peakBytes'] = Peak, Peak * NodeBytes
+            return Stats.finish(problem, Node.path())
+        if Node.forgotten != float('inf'):
+            Stats.reopened += 1
+
+        # Generate the children that are not in memory as cheaply: all of them, or those that were forgotten
+        Children = []
+        for state, action, cost in getSuccessors(Node.state):
+            Known = BestCost.get(state)
+            if Known is not None and Known.cost <= Node.cost + cost:
+                Stats.duplicates += 1
+                continue
+            f = max(Node.priority, Node.cost + cost + heuristic(state, problem))
+            if Node.depth + 2 >= Budget and not problem.isGoalState(state):
+                f = float('inf')        # Its path would not fit in memory with a successor of its own
+                Cut = True
+            Children.append(BoundedNode(state, Node, action, Node.cost + cost, f))
+        Node.forgotten = float('inf')
+
+        # Make room before the children go in, so memory never holds more than the budget: forget
+        # the worst leaves, or leave out the worst children when they are worse than every leaf
+        Children.sort(key=lambda child: child.f)
+        while Used + len(Children) > Budget:
+            Leaf = popWorstLeaf()
+            if Leaf is not None and Leaf.parent is not None and (-Leaf.priority, Leaf.depth) <= (-Children[-1].f, Node.depth + 1):
+                forget(Leaf)
+                Used -= 1
+                continue
+            if Leaf is not None:
+                push(Leaf, Leaf.priority)
+            Node.forgotten = min(Node.forgotten, Children.pop().f)
+        for child in Children:
+            BestCost[child.state] = child
+            Node.children.append(child)
+            push(child, child.f)
+        Used += len(Children)
+        Peak = max(Peak, Used)
+        Stats.sizes(len(Best), Used)
+
+        if not Node.children:           # A dead end, or no room for any child: forget it
+            if Node.parent is None:
+                Cut = Cut or Node.forgotten != float('inf')
+                break
+            Node.priority = max(Node.f, Node.forgotten)
+            forget(Node)
+            Used -= 1
+        elif Node.forgotten != float('inf'):
+            push(Node, max(Node.f, Node.forgotten))
 
-    return None
+    Stats.details['peakNodes'], Stats.details['peakBytes'] = Peak, Peak * NodeBytes
+    if Cut:                             # The frontier ran out because of the budget, not the problem
+        Stats.details['gaveUp'] = '%d nodes are not enough for this problem' % Budget
+        return Stats.finish(problem, [])
+    return Stats.finish(problem, None)
 
 # Abbreviations
 bfs = breadthFirstSearch
 dfs = depthFirstSearch
 astar = aStarSearch
 ucs = uniformCostSearch
+bibfs = bidirectionalBreadthFirstSearch
+biastar = bidirectionalAStarSearch
+idastar = idaStarSearch
+smastar = smaStarSearch
+wastar = weightedAStarSearch
+arastar = araStarSearch
+jps = jumpPointSearch
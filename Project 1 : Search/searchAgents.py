@@ -40,10 +40,12 @@ from typing import List, Tuple, Any
 from game import Directions
 from game import Agent
 from game import Actions
+from game import BitGrid
 import util
 import time
 import search
 import pacman
+import distanceCalculator
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -60,6 +62,20 @@ class GoWestAgent(Agent):
 #       after you fill in parts of search.py          #
 #######################################################
 
+def searchArgument(value):
+    """
+    Converts a value given with -a on the command line into the int, float
+    or bool it spells, if any, so it can be passed on to a search function.
+    """
+    if not isinstance(value, str): return value
+    if value in ['True', 'False']: return value == 'True'
+    for convert in [int, float]:
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
 class SearchAgent(Agent):
     """
     This very general search agent finds a path using a supplied search
@@ -73,20 +89,27 @@ class SearchAgent(Agent):
       depthFirstSearch or dfs
       breadthFirstSearch or bfs
 
+    Any other argument is passed on to the search function, e.g.
+      -a fn=idastar,prob=FoodSearchProblem,heuristic=foodHeuristic,maxNodes=5000
+      -a fn=arastar,prob=FoodSearchProblem,heuristic=foodHeuristic,weight=3,timeLimit=2
+
+    With stats=table (or stats=json) the search.SearchStats of the search
+    are printed as a table (or as one line of JSON) once the path is found.
 
     Note: You should NOT change any code in SearchAgent
     """
 
-    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic'):
+    def __init__(self, fn='depthFirstSearch', prob='PositionSearchProblem', heuristic='nullHeuristic', stats=None, **searchArgs):
         # Warning: some advanced Python magic is employed below to find the right functions and problems
 
         # Get the search function from the name and heuristic
         if fn not in dir(search):
             raise AttributeError(fn + ' is not a search function in search.py.')
         func = getattr(search, fn)
+        searchArgs = dict((key, searchArgument(value)) for key, value in searchArgs.items())
         if 'heuristic' not in func.__code__.co_varnames:
             print('[SearchAgent] using function ' + fn)
-            self.searchFunction = func
+            self.searchFunction = lambda x: func(x, **searchArgs)
         else:
             if heuristic in globals().keys():
                 heur = globals()[heuristic]
@@ -96,7 +119,7 @@ class SearchAgent(Agent):
                 raise AttributeError(heuristic + ' is not a function in searchAgents.py or search.py.')
             print('[SearchAgent] using function %s and heuristic %s' % (fn, heuristic))
             # Note: this bit of Python trickery combines the search algorithm and the heuristic
-            self.searchFunction = lambda x: func(x, heuristic=heur)
+            self.searchFunction = lambda x: func(x, heuristic=heur, **searchArgs)
 
         # Get the search problem type from the name
         if prob not in globals().keys() or not prob.endswith('Problem'):
@@ -104,6 +127,10 @@ class SearchAgent(Agent):
         self.searchType = globals()[prob]
         print('[SearchAgent] using problem type ' + prob)
 
+        if stats not in [None, 'table', 'json']:
+            raise AttributeError('stats must be table or json, not ' + str(stats))
+        self.stats = stats
+
     def registerInitialState(self, state):
         """
         This is the first time that the agent sees the layout of the game
@@ -122,6 +149,18 @@ class SearchAgent(Agent):
         totalCost = problem.getCostOfActions(self.actions)
         print('Path found with total cost of %d in %.1f seconds' % (totalCost, time.time() - starttime))
         if '_expanded' in dir(problem): print('Search nodes expanded: %d' % problem._expanded)
+        if 'mstLookups' in getattr(problem, 'heuristicInfo', {}):
+            Info = problem.heuristicInfo
+            print('Spanning tree cache: %d hits in %d lookups (%.1f%%)' % (Info['mstHits'], Info['mstLookups'],
+                  100.0 * Info['mstHits'] / max(1, Info['mstLookups'])))
+        if 'searchStats' in dir(problem):
+            for cost, bound in problem.searchStats.details.get('bounds', []):   # Weighted and anytime searches
+                print('Path cost %s is at most %.3f times the optimal cost' % (cost, bound))
+            if 'gaveUp' in problem.searchStats.details:                         # Memory-bounded searches
+                print('The search gave up: %s' % problem.searchStats.details['gaveUp'])
+        if 'stats' in dir(self) and 'searchStats' in dir(problem):
+            if self.stats == 'table': print(problem.searchStats)
+            if self.stats == 'json': print(problem.searchStats.toJSON())
 
     def getAction(self, state):
         """
@@ -139,6 +178,44 @@ class SearchAgent(Agent):
         else:
             return Directions.STOP
 
+# Successor tables already built, keyed by walls
+_SUCCESSORS = {}
+_lastWalls, _lastSuccessors = None, None
+
+def successorTable(walls):
+    """
+    Returns a dictionary from every free cell of a walls Grid to a tuple of
+    its successors (nextPosition, action, 1), in the North, South, East,
+    West order of the search problems.
+
+    The table is built the first time these walls are seen and shared by
+    every problem on the same layout, so getSuccessors is a dictionary
+    lookup instead of four vector additions and wall checks.
+    """
+    global _lastWalls, _lastSuccessors
+    if walls is _lastWalls:
+        return _lastSuccessors
+    table = _SUCCESSORS.get(walls)
+    if table is None:
+        table = {}
+        for x in range(walls.width):
+            for y in range(walls.height):
+                if walls[x][y]: continue
+                successors = []
+                for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
+                    dx, dy = Actions.directionToVector(action)
+                    nextx, nexty = int(x + dx), int(y + dy)
+                    if not walls[nextx][nexty]:
+                        successors.append(((nextx, nexty), action, 1))
+                table[(x, y)] = tuple(successors)
+        _SUCCESSORS[walls.copy()] = table
+    _lastWalls, _lastSuccessors = walls, table
+    return table
+
+def unitCost(state):
+    "The default cost function of a PositionSearchProblem"
+    return 1
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, successor
@@ -150,7 +227,7 @@ class PositionSearchProblem(search.SearchProblem):
     Note: this search problem is fully specified; you should NOT change it.
     """
 
-    def __init__(self, gameState, costFn = lambda x: 1, goal=(1,1), start=None, warn=True, visualize=True):
+    def __init__(self, gameState, costFn = unitCost, goal=(1,1), start=None, warn=True, visualize=True):
         """
         Stores the start and goal.
 
@@ -159,6 +236,7 @@ class PositionSearchProblem(search.SearchProblem):
         goal: A position in the gameState
         """
         self.walls = gameState.getWalls()
+        self.successors = successorTable(self.walls)
         self.startState = gameState.getPacmanPosition()
         if start != None: self.startState = start
         self.goal = goal
@@ -198,15 +276,11 @@ class PositionSearchProblem(search.SearchProblem):
          cost of expanding to that successor
         """
 
-        successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append( ( nextState, action, cost) )
+        if self.costFn is unitCost:
+            successors = list(self.successors[state])
+        else:
+            costFn = self.costFn
+            successors = [(nextState, action, costFn(nextState)) for nextState, action, _ in self.successors[state]]
 
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
@@ -216,6 +290,26 @@ class PositionSearchProblem(search.SearchProblem):
 
         return successors
 
+    def getGoalState(self):
+        "The single goal, for the bidirectional searches"
+        return self.goal
+
+    def getPredecessors(self, state):
+        """
+        Returns the positions from which state can be reached in one step,
+        the action that leads from each of them to state, and its cost.
+        """
+        cost = self.costFn(state)
+        predecessors = [(previous, Actions.reverseDirection(action), cost) for previous, action, _ in self.successors[state]]
+
+        # Bookkeeping for display purposes
+        self._expanded += 1
+        if state not in self._visited:
+            self._visited[state] = True
+            self._visitedlist.append(state)
+
+        return predecessors
+
     def getCostOfActions(self, actions):
         """
         Returns the cost of a particular sequence of actions. If those actions
@@ -284,6 +378,7 @@ class CornersProblem(search.SearchProblem):
         Stores the walls, pacman's starting position and corners.
         """
         self.walls = startingGameState.getWalls()
+        self.successors = successorTable(self.walls)
         self.startingPosition = startingGameState.getPacmanPosition()
         top, right = self.walls.height-2, self.walls.width-2
         self.corners = ((1,1), (1,top), (right, 1), (right, top))
@@ -329,24 +424,13 @@ class CornersProblem(search.SearchProblem):
         "*** YOUR CODE HERE ***"
 
         successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            # Add a successor state to the successor list if the action is legal
-            
-            x, y = state[0]                             #
-            dx, dy = Actions.directionToVector(action)  # Here's a code snippet for figuring out 
-            nextx, nexty = int(x + dx), int(y + dy)     # whether a new position hits a wall
-            hitsWall = self.walls[nextx][nexty]         #
-
-            if not hitsWall:
-                NextPosition = (nextx, nexty)
-                VisitedCorners = list(state[1])         # Converting the tuple to list so i can change it
+        for NextPosition, action, cost in self.successors[state[0]]:   # Only the legal moves are in the table
+            VisitedCorners = state[1]
 
-                if NextPosition in self.corners and NextPosition not in VisitedCorners:
-                    VisitedCorners.append(NextPosition)
+            if NextPosition in self.corners and NextPosition not in VisitedCorners:
+                VisitedCorners = VisitedCorners + (NextPosition,)
 
-                VisitedCorners = tuple(VisitedCorners)  # Convert it back to tuple before it is added to successors list
-
-                successors.append(((NextPosition, VisitedCorners), action, 1))  # Cost = 1 
+            successors.append(((NextPosition, VisitedCorners), action, cost))  # Cost = 1
 
         self._expanded += 1 # DO NOT CHANGE
         return successors
@@ -416,6 +500,100 @@ class AStarCornersAgent(SearchAgent):
         self.searchFunction = lambda prob: search.aStarSearch(prob, cornersHeuristic)
         self.searchType = CornersProblem
 
+class CornersMaskProblem(CornersProblem):
+    """
+    The same search problem as CornersProblem, with the visited corners packed
+    into a 4-bit mask instead of a tuple.
+
+    A search state is a tuple ( pacmanPosition, cornerMask ) where bit i of
+    cornerMask is set once problem.corners[i] has been visited.  The moves
+    out of every position carry the bit of the cell they reach, so a
+    successor only ors two ints.  problem.table (see cornerTable) holds the
+    exact cost to finish from every state, which is what
+    cornersMaskHeuristic looks up.
+    """
+    def __init__(self, startingGameState: pacman.GameState):
+        CornersProblem.__init__(self, startingGameState)
+        self.cornerBits = {}                # Corner -> its bit in the mask
+        for i, corner in enumerate(self.corners):
+            self.cornerBits[corner] = self.cornerBits.get(corner, 0) | 1 << i
+        self.table = cornerTable(self.walls, self.corners, startingGameState.data.layout)
+
+        # (next position, action, bit of the corner there) for the moves out of every free cell
+        self.moves = {}
+        for position, successors in self.successors.items():
+            self.moves[position] = [(nextPosition, direction, self.cornerBits.get(nextPosition, 0))
+                                    for nextPosition, direction, _ in successors]
+
+    def getStartState(self):
+        return (self.startingPosition, self.cornerBits.get(self.startingPosition, 0))
+
+    def isGoalState(self, state):
+        return state[1] == ALL_CORNERS
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        self._expanded += 1 # DO NOT CHANGE
+        position, cornerMask = state
+        return [((nextPosition, cornerMask | bit), direction, 1) for nextPosition, direction, bit in self.moves[position]]
+
+ALL_CORNERS = 0b1111
+
+# Corner tables already built, keyed by walls
+_CORNER_TABLES = {}
+
+def cornerTable(walls, corners, layout=None):
+    """
+    Returns a dictionary from every free cell of a walls Grid to a list of 16
+    costs: entry m is the length of the shortest walk from the cell through
+    every corner whose bit is not set in m (the corners not visited yet), in
+    maze distance.  It is infinite when one of those corners is out of reach.
+
+    The walk is found exactly: the maze distances between the corners and
+    from every cell to each corner come from the Distancer of the walls, and
+    the shortest tour from each corner through every subset of the others is
+    built up from the smaller subsets.  The table is built once per layout.
+    """
+    table = _CORNER_TABLES.get(walls)
+    if table is not None:
+        return table
+    distancer = distanceCalculator.getDistancer(walls, layout)
+    n = len(corners)
+    between = [[distancer.getDistance(a, b) for b in corners] for a in corners]
+
+    # tour[i][m] = shortest walk from corner i through the corners in m (i not in m)
+    tour = [[0] * (1 << n) for i in range(n)]
+    for m in range(1, 1 << n):
+        for i in range(n):
+            if m >> i & 1: continue
+            tour[i][m] = min(between[i][j] + tour[j][m & ~(1 << j)] for j in range(n) if m >> j & 1)
+
+    table = {}
+    for cell in distancer.cells:
+        toCorner = [distancer.getDistance(cell, corner) for corner in corners]
+        costs = [0] * (1 << n)
+        for visited in range(ALL_CORNERS):
+            left = ALL_CORNERS & ~visited
+            costs[visited] = min(toCorner[j] + tour[j][left & ~(1 << j)] for j in range(n) if left >> j & 1)
+        table[cell] = costs
+    _CORNER_TABLES[walls.copy()] = table
+    return table
+
+def cornersMaskHeuristic(state, problem: CornersMaskProblem):
+    """
+    The exact cost of visiting the corners left from a CornersMaskProblem
+    state, looked up in problem.table; being exact it is both admissible and
+    consistent.
+    """
+    position, cornerMask = state
+    return problem.table[position][cornerMask]
+
+class AStarCornersMaskAgent(SearchAgent):
+    "A SearchAgent for CornersMaskProblem using A* and cornersMaskHeuristic"
+    def __init__(self):
+        self.searchFunction = lambda prob: search.aStarSearch(prob, cornersMaskHeuristic)
+        self.searchType = CornersMaskProblem
+
 class FoodSearchProblem:
     """
     A search problem associated with finding the a path that collects all of the
@@ -428,6 +606,7 @@ class FoodSearchProblem:
     def __init__(self, startingGameState: pacman.GameState):
         self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
         self.walls = startingGameState.getWalls()
+        self.successors = successorTable(self.walls)
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
         self.heuristicInfo = {} # A dictionary for the heuristic to store information
@@ -442,14 +621,10 @@ class FoodSearchProblem:
         "Returns successor states, the actions they require, and a cost of 1."
         successors = []
         self._expanded += 1 # DO NOT CHANGE
-        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state[0]
-            dx, dy = Actions.directionToVector(direction)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
-                nextFood[nextx][nexty] = False
-                successors.append( ( ((nextx, nexty), nextFood), direction, 1) )
+        for (nextx, nexty), direction, cost in self.successors[state[0]]:
+            nextFood = state[1].copy()
+            nextFood[nextx][nexty] = False
+            successors.append( ( ((nextx, nexty), nextFood), direction, cost) )
         return successors
 
     def getCostOfActions(self, actions):
@@ -466,6 +641,81 @@ class FoodSearchProblem:
             cost += 1
         return cost
 
+class FoodMaskSearchProblem(FoodSearchProblem):
+    """
+    The same search problem as FoodSearchProblem, with the remaining food
+    packed into an integer instead of a Grid.
+
+    A search state is a tuple ( pacmanPosition, foodMask ) where bit i of
+    foodMask is set while the i-th dot of problem.foodCells has not been
+    eaten.  The bit of every cell and the moves out of every position are
+    computed once, so a successor only clears a bit of an int, and states
+    hash and compare as a pair of small tuples/ints.
+
+    foodGrid(foodMask) turns a mask back into a food Grid, to display a
+    state or hand it to code that expects a FoodSearchProblem state.
+    """
+    def __init__(self, startingGameState: pacman.GameState):
+        FoodSearchProblem.__init__(self, startingGameState)
+        food = startingGameState.getFood()
+        self.foodCells = food.asList()
+        self.foodBits = {}                  # Food cell -> its bit in the mask
+        for i, cell in enumerate(self.foodCells):
+            self.foodBits[cell] = 1 << i
+        self.start = (startingGameState.getPacmanPosition(), (1 << len(self.foodCells)) - 1)
+
+        # (next position, action, mask of the food left there) for the moves out of every free cell
+        self.moves = {}
+        for position, successors in self.successors.items():
+            self.moves[position] = [(nextPosition, direction, ~self.foodBits.get(nextPosition, 0))
+                                    for nextPosition, direction, _ in successors]
+
+    def isGoalState(self, state):
+        return state[1] == 0
+
+    def getSuccessors(self, state):
+        "Returns successor states, the actions they require, and a cost of 1."
+        self._expanded += 1 # DO NOT CHANGE
+        position, foodMask = state
+        return [((nextPosition, foodMask & keep), direction, 1) for nextPosition, direction, keep in self.moves[position]]
+
+    def foodGrid(self, foodMask):
+        "Returns the food Grid that a food mask stands for"
+        height = self.walls.height
+        bits = 0
+        for i, (x, y) in enumerate(self.foodCells):
+            if foodMask >> i & 1:
+                bits |= 1 << (x * height + y)
+        return BitGrid(self.walls.width, height, bits=bits)
+
+def foodMaskHeuristic(state, problem: FoodMaskSearchProblem):
+    """
+    foodHeuristic for the states of a FoodMaskSearchProblem: the maze
+    distance to the farthest dot left, read straight off the mask.
+
+    The first time a position is seen its dots are sorted from the farthest
+    to the closest, as (distance, bit) pairs kept in problem.heuristicInfo,
+    so the heuristic is the first pair whose bit is still set.
+    """
+    position, foodMask = state
+    if foodMask == 0:       # No food left means we are in a goal state
+        return 0
+
+    Info = problem.heuristicInfo
+    if 'farthestFood' not in Info:
+        if 'distancer' not in Info:
+            Info['distancer'] = distanceCalculator.getDistancer(problem.walls, problem.startingGameState.data.layout)
+        Info['farthestFood'] = {}
+    Farthest = Info['farthestFood'].get(position)
+    if Farthest is None:
+        Distancer = Info['distancer']
+        Farthest = sorted(((Distancer.getDistance(position, cell), 1 << i) for i, cell in enumerate(problem.foodCells)), reverse=True)
+        Info['farthestFood'][position] = Farthest
+
+    for distance, bit in Farthest:
+        if foodMask & bit:
+            return distance
+
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
     def __init__(self):
@@ -504,36 +754,96 @@ def foodHeuristic(state: Tuple[Tuple, List[List]], problem: FoodSearchProblem):
 
     "*** YOUR CODE HERE ***"
 
-    from util import manhattanDistance
-
     Total = []
     Food = foodGrid.asList()
 
-    if problem.isGoalState(state):
+    if not Food:        # No food left means we are in a goal state
         return 0
 
+    if 'distancer' not in problem.heuristicInfo:                        # The maze distances are computed once per layout
+        problem.heuristicInfo['distancer'] = distanceCalculator.getDistancer(problem.walls, problem.startingGameState.data.layout)
+    Distancer = problem.heuristicInfo['distancer']
+
     for food in Food:
-        Total.append(manhattanDistance(position, food))     # Just using manhattan to find the distances
-        
-        # Total.append(mazeDistance(position, food, problem.startingGameState))     # With mazedistance the test is passing with 5/4 but need to wait 1 minute
+        Total.append(Distancer.getDistance(position, food))     # Maze distance is a table lookup so it is as cheap as manhattan
 
     return max(Total)       # And returning the highest distance
 
+def mstFoodHeuristic(state, problem: FoodSearchProblem):
+    """
+    A stronger heuristic for the FoodSearchProblem (and the states of a
+    FoodMaskSearchProblem): the maze distance to the closest dot plus the
+    weight of a minimum spanning tree of the remaining dots under maze
+    distances.  Pacman has to reach one of the dots and then walk at least
+    a tree that connects all of them, so it is admissible, and since eating
+    a dot lowers the tree by at most the distance to the next closest dot,
+    it is consistent as well.
+
+    The distances between the dots are computed once, and the weight of the
+    tree is memoized per set of remaining dots (as a bitmask over the
+    starting food) in problem.heuristicInfo, which also counts the lookups
+    and the hits of that memo in 'mstLookups' and 'mstHits'.
+    """
+    position, food = state
+    Info = problem.heuristicInfo
+
+    if 'foodIndex' not in Info:         # Everything that only depends on the layout, computed once
+        if 'distancer' not in Info:
+            Info['distancer'] = distanceCalculator.getDistancer(problem.walls, problem.startingGameState.data.layout)
+        Cells = problem.startingGameState.getFood().asList()
+        Info['foodCells'] = Cells
+        Info['foodIndex'] = dict((cell, i) for i, cell in enumerate(Cells))
+        Info['foodDistances'] = [[Info['distancer'].getDistance(a, b) for b in Cells] for a in Cells]
+        Info['mst'], Info['mstLookups'], Info['mstHits'] = {}, 0, 0
+    Cells, Distances = Info['foodCells'], Info['foodDistances']
+
+    if isinstance(food, int):           # A FoodMaskSearchProblem state already is the bitmask
+        Mask = food
+    else:
+        Mask = 0
+        for cell in food.asList():
+            Mask |= 1 << Info['foodIndex'][cell]
+    if Mask == 0:                       # No food left means we are in a goal state
+        return 0
+
+    Remaining = [i for i in range(len(Cells)) if Mask >> i & 1]
+    Nearest = min(Info['distancer'].getDistance(position, Cells[i]) for i in Remaining)
+
+    Info['mstLookups'] += 1
+    if Mask in Info['mst']:
+        Info['mstHits'] += 1
+        return Nearest + Info['mst'][Mask]
+
+    # Prim's algorithm over the remaining dots
+    Weight = 0
+    Closest = dict((i, Distances[Remaining[0]][i]) for i in Remaining[1:])   # Distance of every dot to the tree
+    while Closest:
+        Next = min(Closest, key=Closest.get)
+        Weight += Closest.pop(Next)
+        for i in Closest:
+            if Distances[Next][i] < Closest[i]:
+                Closest[i] = Distances[Next][i]
+    Info['mst'][Mask] = Weight
+    return Nearest + Weight
+
 
 class ClosestDotSearchAgent(SearchAgent):
     "Search for all food using a sequence of searches"
     def registerInitialState(self, state):
         self.actions = []
-        currentState = state
-        while(currentState.getFood().count() > 0):
-            nextPathSegment = self.findPathToClosestDot(currentState) # The missing piece
+        walls = state.getWalls()
+        x, y = state.getPacmanPosition()
+        planner = ClosestDotPlanner(walls, state.getFood(), (x, y))
+        while planner.foodMask:
+            nextPathSegment = planner.pathToClosestDot((x, y))
+            if nextPathSegment is None: break   # The food left cannot be reached
             self.actions += nextPathSegment
             for action in nextPathSegment:
-                legal = currentState.getLegalActions()
-                if action not in legal:
-                    t = (str(action), str(currentState))
-                    raise Exception('findPathToClosestDot returned an illegal move: %s!\n%s' % t)
-                currentState = currentState.generateSuccessor(0, action)
+                dx, dy = Actions.directionToVector(action)
+                x, y = int(x + dx), int(y + dy)
+                if walls[x][y]:
+                    raise Exception('pathToClosestDot returned an illegal move: %s into %s!' % (action, (x, y)))
+            planner.eat((x, y))
         self.actionIndex = 0
         print('Path found with cost %d.' % len(self.actions))
 
@@ -546,11 +856,124 @@ class ClosestDotSearchAgent(SearchAgent):
         startPosition = gameState.getPacmanPosition()
         food = gameState.getFood()
         walls = gameState.getWalls()
-        problem = AnyFoodSearchProblem(gameState)
 
         "*** YOUR CODE HERE ***"
-        
-        return search.aStarSearch(problem)
+
+        # A BFS out of every dot, walked down from Pacman; it returns None when no food is left.
+        # The planner is kept between calls and only catches up with the dots eaten since the last one
+        planner = getattr(self, 'planner', None)
+        if planner is None or planner.walls != walls or not planner.update(food):
+            planner = self.planner = ClosestDotPlanner(walls, food)
+        return planner.pathToClosestDot(startPosition)
+
+class ClosestDotPlanner:
+    """
+    Plans the greedy closest dot tour of ClosestDotSearchAgent without a
+    search per dot.
+
+    A multi-source BFS from every dot gives each free cell its distance to
+    the nearest dot and one of the nearest dots (its owner).  The path to
+    the closest dot from any cell walks down the distances, taking the
+    first successor in North, South, East, West order at every step: that
+    is the path, and the dot, a BFS from the cell out to any food finds
+    first, so the tours are those of a search per dot.  When a dot is eaten
+    only the cells it owned can change: they are cleared and refilled from
+    the cells around them, whose distances still hold, so every other BFS
+    layer is reused as is.  The dots left are the bits of foodMask, bit i
+    standing for foodCells[i].
+    """
+    def __init__(self, walls, food, start=None):
+        self.walls = walls
+        self.successors = successorTable(walls)
+        self.foodCells = food.asList()
+        self.foodIndex = {}                 # Food cell -> its bit in foodMask
+        for i, cell in enumerate(self.foodCells):
+            self.foodIndex[cell] = i
+        self.foodMask = (1 << len(self.foodCells)) - 1
+        if start in self.foodIndex:         # Pacman eats the dot he starts on
+            self.foodMask &= ~(1 << self.foodIndex[start])
+        self.distance, self.owner = {}, {}
+        seeds = {}
+        for i, cell in enumerate(self.foodCells):
+            if self.foodMask >> i & 1:
+                self.distance[cell], self.owner[cell] = 0, i
+                seeds[cell] = 0
+        self.fill(seeds)
+
+    def fill(self, seeds):
+        """
+        Runs a BFS out of the seeds, a dictionary from cells whose distance
+        and owner are set to their distance, over the cells whose distance is
+        missing or longer.  Seeds come at different distances, so they are
+        kept in a bucket per distance.
+        """
+        distance, owner, successors = self.distance, self.owner, self.successors
+        buckets = {}
+        for cell, d in seeds.items():
+            buckets.setdefault(d, []).append(cell)
+        d = min(buckets) if buckets else 0
+        while buckets:
+            for cell in buckets.pop(d, []):
+                for nextCell, _, _ in successors[cell]:
+                    nextDistance = distance.get(nextCell)
+                    if nextDistance is None or nextDistance > d + 1:
+                        distance[nextCell], owner[nextCell] = d + 1, owner[cell]
+                        buckets.setdefault(d + 1, []).append(nextCell)
+            d += 1
+
+    def eat(self, dot):
+        "Removes a dot and updates the distances of the cells that were closest to it"
+        i = self.foodIndex.get(dot)
+        if i is None or not self.foodMask >> i & 1: return
+        self.foodMask &= ~(1 << i)
+        distance, owner = self.distance, self.owner
+        cleared = [cell for cell in owner if owner[cell] == i]
+        for cell in cleared:
+            del distance[cell], owner[cell]
+        seeds = {}
+        for cell in cleared:                # The nearest dot of a cleared cell is reached through an intact one
+            for nextCell, _, _ in self.successors[cell]:
+                if nextCell in distance:
+                    seeds[nextCell] = distance[nextCell]
+        self.fill(seeds)
+
+    def update(self, food):
+        """
+        Eats the dots left that are gone from food.  Returns False, changing
+        nothing, when food has a dot that is not left in the planner.
+
+        >>> from batchSearch import startingState
+        >>> state = startingState('tinySearch')
+        >>> planner = ClosestDotPlanner(state.getWalls(), state.getFood())
+        >>> for action in planner.pathToClosestDot(state.getPacmanPosition()):
+        ...     state = state.generateSuccessor(0, action)
+        >>> planner.update(state.getFood())
+        True
+        >>> planner.distance == ClosestDotPlanner(state.getWalls(), state.getFood()).distance
+        True
+        >>> planner.update(startingState('tinySearch').getFood())
+        False
+        """
+        for cell in food.asList():
+            i = self.foodIndex.get(cell)
+            if i is None or not self.foodMask >> i & 1: return False
+        for i, (x, y) in enumerate(self.foodCells):
+            if self.foodMask >> i & 1 and not food[x][y]:
+                self.eat((x, y))
+        return True
+
+    def pathToClosestDot(self, position):
+        "Returns the actions from position to its closest dot, or None if no dot can be reached"
+        distance = self.distance
+        if position not in distance: return None
+        path = []
+        while distance[position] > 0:
+            for nextPosition, action, _ in self.successors[position]:
+                if distance.get(nextPosition) == distance[position] - 1:
+                    path.append(action)
+                    position = nextPosition
+                    break
+        return path
 
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
@@ -574,8 +997,9 @@ class AnyFoodSearchProblem(PositionSearchProblem):
 
         # Store info for the PositionSearchProblem (no need to change this)
         self.walls = gameState.getWalls()
+        self.successors = successorTable(self.walls)
         self.startState = gameState.getPacmanPosition()
-        self.costFn = lambda x: 1
+        self.costFn = unitCost
         self._visited, self._visitedlist, self._expanded = {}, [], 0 # DO NOT CHANGE
 
     def isGoalState(self, state: Tuple[int, int]):
@@ -604,5 +1028,4 @@ def mazeDistance(point1: Tuple[int, int], point2: Tuple[int, int], gameState: pa
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    return distanceCalculator.getDistancer(walls, gameState.data.layout).getDistance(point1, point2)
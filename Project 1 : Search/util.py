@@ -29,6 +29,7 @@
 import sys
 import inspect
 import heapq, random
+from collections import deque
 
 
 class FixedRandom:
@@ -150,23 +151,31 @@ class Stack:
 class Queue:
     "A container with a first-in-first-out (FIFO) queuing policy."
     def __init__(self):
-        self.list = []
+        self.list = deque()
 
     def push(self,item):
         "Enqueue the 'item' into the queue"
-        self.list.insert(0,item)
+        self.list.append(item)
+
+    def pushMany(self,items):
+        "Enqueue all the 'items', in order, into the queue"
+        self.list.extend(items)
 
     def pop(self):
         """
           Dequeue the earliest enqueued item still in the queue. This
           operation removes the item from the queue.
         """
-        return self.list.pop()
+        return self.list.popleft()
 
     def isEmpty(self):
         "Returns true if the queue is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        "Returns the number of items in the queue"
+        return len(self.list)
+
 class PriorityQueue:
     """
       Implements a priority queue data structure. Each inserted item
@@ -221,6 +230,118 @@ class PriorityQueueWithFunction(PriorityQueue):
         "Adds an item to the queue with priority from the priority function"
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
+class IndexedPriorityQueue:
+    """
+      Implements a priority queue as a binary heap that also remembers the
+      position of every item in it.  Each item can be in the queue at most
+      once, so instead of pushing a duplicate with a better priority (which
+      leaves a stale entry behind), update lowers the priority of the
+      existing entry in O(log n) (decrease-key).
+
+      Like PriorityQueue, items with equal priority are popped in the order
+      they were pushed; an item whose priority is lowered is ordered as if
+      it had just been pushed.  The 'stale' attribute counts the decrease-key
+      operations, i.e. the stale entries a duplicate-pushing heap would hold.
+
+      >>> queue = IndexedPriorityQueue()
+      >>> for item, priority in [('a', 5), ('b', 3), ('c', 4)]:
+      ...     queue.push(item, priority)
+      >>> queue.update('a', 1), queue.update('c', 6), queue.update('d', 3)
+      (True, False, True)
+      >>> len(queue), queue.getPriority('a'), queue.stale
+      (4, 1, 1)
+      >>> [queue.pop() for i in range(len(queue))]
+      ['a', 'b', 'd', 'c']
+    """
+    def  __init__(self):
+        self.heap = []          # Entries (priority, count, item)
+        self.position = {}      # item -> index of its entry in the heap
+        self.count = 0
+        self.stale = 0
+
+    def push(self, item, priority):
+        if item in self.position:
+            raise ValueError('item is already in the queue, use update')
+        self.heap.append((priority, self.count, item))
+        self.count += 1
+        self.position[item] = len(self.heap) - 1
+        self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        heap = self.heap
+        last = heap.pop()
+        if heap:
+            (_, _, item) = heap[0]
+            heap[0] = last
+            self.position[last[2]] = 0
+            self._siftDown(0)
+        else:
+            item = last[2]
+        del self.position[item]
+        return item
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def getPriority(self, item):
+        "Returns the priority of an item in the queue"
+        return self.heap[self.position[item]][0]
+
+    def update(self, item, priority):
+        """
+          If item is in the queue with a higher priority, lowers it and returns True.
+          If item is in the queue with equal or lower priority, returns False.
+          If item is not in the queue, pushes it and returns True.
+        """
+        index = self.position.get(item)
+        if index is None:
+            self.push(item, priority)
+            return True
+        if self.heap[index][0] <= priority:
+            return False
+        self.heap[index] = (priority, self.count, item)
+        self.count += 1
+        self.stale += 1
+        self._siftUp(index)
+        return True
+
+    def _siftUp(self, index):
+        heap, position = self.heap, self.position
+        entry = heap[index]
+        while index > 0:
+            parent = (index - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[index] = heap[parent]
+            position[heap[index][2]] = index
+            index = parent
+        heap[index] = entry
+        position[entry[2]] = index
+
+    def _siftDown(self, index):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[index] = heap[child]
+            position[heap[index][2]] = index
+            index = child
+        heap[index] = entry
+        position[entry[2]] = index
+
 
 def manhattanDistance( xy1, xy2 ):
     "Returns the Manhattan distance between points xy1 and xy2"
@@ -312,9 +433,7 @@ class Counter(dict):
         >>> a.sortedKeys()
         ['second', 'third', 'first']
         """
-        sortedItems = self.items()
-        compare = lambda x, y:  sign(y[1] - x[1])
-        sortedItems.sort(cmp=compare)
+        sortedItems = sorted(self.items(), key=lambda x: -x[1])
         return [x[0] for x in sortedItems]
 
     def totalCount(self):
@@ -23,6 +23,7 @@
 from util import *
 import time
 import os
+import random
 import traceback
 import sys
 
@@ -79,11 +80,35 @@ class Configuration:
 
     The convention for positions, like a graph, is that (0,0) is the lower left corner, x increases
     horizontally and y increases vertically.  Therefore, north is the direction of increasing y, or (0,1).
-    """
 
-    def __init__(self, pos, direction):
-        self.pos = pos
-        self.direction = direction
+    Configurations never change once made (moving makes a new one), so they
+    are interned: Configuration(pos, direction) returns the single object for
+    that position and direction (until the next game is initialized), its
+    hash is computed once, and the successor it reaches by each vector is
+    remembered.  Do not assign to pos or direction; make a new Configuration
+    instead.
+    """
+    __slots__ = ['pos', 'direction', '_hash', '_successors']
+
+    # Every Configuration made since the current game started, by position,
+    # direction and the types of the coordinates: (1, 2) == (1.0, 2.0), but
+    # getPosition must return the numbers it was given
+    _interned = {}
+
+    def __new__(cls, pos, direction):
+        key = (pos, direction, type(pos[0]), type(pos[1]))
+        configuration = Configuration._interned.get(key)
+        if configuration is None:
+            configuration = object.__new__(cls)
+            configuration.pos = pos
+            configuration.direction = direction
+            configuration._hash = hash(hash(pos) + 13 * hash(direction))
+            configuration._successors = {}
+            Configuration._interned[key] = configuration
+        return configuration
+
+    def __reduce__(self):
+        return (Configuration, (self.pos, self.direction))
 
     def getPosition(self):
         return (self.pos)
@@ -101,9 +126,7 @@ class Configuration:
         return (self.pos == other.pos and self.direction == other.direction)
 
     def __hash__(self):
-        x = hash(self.pos)
-        y = hash(self.direction)
-        return hash(x + 13 * y)
+        return self._hash
 
     def __str__(self):
         return "(x,y)="+str(self.pos)+", "+str(self.direction)
@@ -116,18 +139,28 @@ class Configuration:
 
         Actions are movement vectors.
         """
-        x, y = self.pos
-        dx, dy = vector
-        direction = Actions.vectorToDirection(vector)
-        if direction == Directions.STOP:
-            direction = self.direction  # There is no stop direction
-        return Configuration((x + dx, y+dy), direction)
+        successor = self._successors.get(vector)
+        if successor is None:
+            x, y = self.pos
+            dx, dy = vector
+            direction = Actions.vectorToDirection(vector)
+            if direction == Directions.STOP:
+                direction = self.direction  # There is no stop direction
+            successor = self._successors[vector] = Configuration(
+                (x + dx, y+dy), direction)
+        return successor
 
 
 class AgentState:
     """
     AgentStates hold the state of an agent (configuration, speed, scared, etc).
+
+    Game states share them until one changes (see
+    GameStateData.mutableAgentState), and their hash reuses the one cached
+    by their Configuration.
     """
+    __slots__ = ['start', 'configuration', 'isPacman',
+                 'scaredTimer', 'numCarrying', 'numReturned']
 
     def __init__(self, startConfiguration, isPacman):
         self.start = startConfiguration
@@ -150,10 +183,12 @@ class AgentState:
         return self.configuration == other.configuration and self.scaredTimer == other.scaredTimer
 
     def __hash__(self):
-        return hash(hash(self.configuration) + 13 * hash(self.scaredTimer))
+        return hash(hash(self.configuration) + 13 * self.scaredTimer)
 
     def copy(self):
-        state = AgentState(self.start, self.isPacman)
+        state = AgentState.__new__(AgentState)
+        state.start = self.start
+        state.isPacman = self.isPacman
         state.configuration = self.configuration
         state.scaredTimer = self.scaredTimer
         state.numCarrying = self.numCarrying
@@ -262,7 +297,7 @@ class Grid:
         return tuple(bits)
 
     def _cellIndexToPosition(self, index):
-        x = index / self.height
+        x = index // self.height
         y = index % self.height
         return x, y
 
@@ -293,6 +328,164 @@ class Grid:
         return bools
 
 
+class BitGrid:
+    """
+    A 2-dimensional array of booleans with the same interface as Grid, backed
+    by the bits of a single integer: cell (x,y) is bit x * height + y.  Data
+    is still accessed via grid[x][y].
+
+    Copying a BitGrid only copies the integer, count() is a popcount and the
+    hash is computed once and kept until the grid is modified.  The bits are
+    numbered like the ones Grid.__hash__ adds up, so a BitGrid and a Grid
+    with the same contents have the same hash.
+
+    >>> grid, bitGrid = Grid(4, 3), BitGrid(4, 3)
+    >>> for x, y in [(0, 0), (3, 2), (1, 2), (2, 0)]:
+    ...     grid[x][y] = bitGrid[x][y] = True
+    >>> bitGrid.asList() == grid.asList(), bitGrid.asList(False) == grid.asList(False)
+    (True, True)
+    >>> bitGrid.count(), bitGrid.count(False), str(bitGrid) == str(grid)
+    (4, 8, True)
+    >>> bitGrid == grid, hash(bitGrid) == hash(grid), bitGrid.packBits() == grid.packBits()
+    (True, True, True)
+    >>> copy = bitGrid.copy()
+    >>> copy[3][-1] = False
+    >>> bitGrid[3][2], copy[3][2], copy == bitGrid, hash(copy) == hash(copy.toGrid())
+    (True, False, False, True)
+    >>> BitGrid.fromGrid(grid) == bitGrid, bitGrid.toGrid() == grid
+    (True, True)
+    """
+
+    def __init__(self, width, height, initialValue=False, bits=0):
+        if initialValue not in [False, True]:
+            raise Exception('Grids can only contain booleans')
+        self.width = width
+        self.height = height
+        self.bits = (1 << (width * height)) - 1 if initialValue else bits
+        self._hash = None
+
+    def fromGrid(grid):
+        "Returns a BitGrid with the same contents as a Grid"
+        bits = 0
+        for x in range(grid.width):
+            for y in range(grid.height):
+                if grid[x][y]:
+                    bits |= 1 << (x * grid.height + y)
+        return BitGrid(grid.width, grid.height, bits=bits)
+    fromGrid = staticmethod(fromGrid)
+
+    def toGrid(self):
+        "Returns a list-backed Grid with the same contents"
+        g = Grid(self.width, self.height)
+        g.data = self.data
+        return g
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.width
+        if not 0 <= i < self.width:
+            raise IndexError('grid index out of range')
+        return _BitColumn(self, i)
+
+    def __setitem__(self, key, item):
+        column = _BitColumn(self, key)
+        for y in range(self.height):
+            column[y] = item[y]
+
+    def _get(self, index):
+        return (self.bits >> index) & 1 == 1
+
+    def _set(self, index, value):
+        if value:
+            self.bits |= 1 << index
+        else:
+            self.bits &= ~(1 << index)
+        self._hash = None
+
+    def getData(self):
+        "Returns the contents as a list of columns, like Grid.data"
+        return [[self._get(x * self.height + y) for y in range(self.height)] for x in range(self.width)]
+    data = property(getData)
+
+    def __str__(self):
+        out = [[str(self._get(x * self.height + y))[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        if other == None:
+            return False
+        if isinstance(other, BitGrid):
+            return self.bits == other.bits and self.width == other.width and self.height == other.height
+        return self.data == other.data
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(self.bits)
+        return self._hash
+
+    def copy(self):
+        g = BitGrid(self.width, self.height, bits=self.bits)
+        g._hash = self._hash
+        return g
+
+    def deepCopy(self):
+        return self.copy()
+
+    def shallowCopy(self):
+        return self.copy()
+
+    def count(self, item=True):
+        ones = self.bits.bit_count()
+        if item:
+            return ones
+        return self.width * self.height - ones
+
+    def asList(self, key=True):
+        if not key:
+            return [(x, y) for x in range(self.width) for y in range(self.height) if not self._get(x * self.height + y)]
+        list = []
+        bits = self.bits
+        while bits:
+            lowest = bits & -bits
+            list.append(divmod(lowest.bit_length() - 1, self.height))
+            bits ^= lowest
+        return list
+
+    def packBits(self):
+        """
+        Returns an efficient int list representation, the same one as
+        Grid.packBits.
+        """
+        return self.toGrid().packBits()
+
+
+class _BitColumn:
+    "The column grid[x] of a BitGrid, so that grid[x][y] reads and writes its bits"
+    __slots__ = ('grid', 'offset')
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.offset = x * grid.height
+
+    def __getitem__(self, y):
+        if y < 0:
+            y += self.grid.height
+        if not 0 <= y < self.grid.height:
+            raise IndexError('grid index out of range')
+        return (self.grid.bits >> (self.offset + y)) & 1 == 1
+
+    def __setitem__(self, y, value):
+        if y < 0:
+            y += self.grid.height
+        if not 0 <= y < self.grid.height:
+            raise IndexError('grid index out of range')
+        self.grid._set(self.offset + y, value)
+
+    def __len__(self):
+        return self.grid.height
+
+
 def reconstituteGrid(bitRep):
     if type(bitRep) is not type((1, 2)):
         return bitRep
@@ -350,6 +543,10 @@ class Actions:
     directionToVector = staticmethod(directionToVector)
 
     def getPossibleActions(config, walls):
+        legal = Actions.legalActionTables(walls)[0].get(config.pos)
+        if legal is not None:  # On a grid point
+            return legal[:]
+
         possible = []
         x, y = config.pos
         x_int, y_int = int(x + 0.5), int(y + 0.5)
@@ -369,6 +566,46 @@ class Actions:
 
     getPossibleActions = staticmethod(getPossibleActions)
 
+    def _isFree(walls, x, y):
+        return 0 <= x < walls.width and 0 <= y < walls.height and not walls[x][y]
+    _isFree = staticmethod(_isFree)
+
+    def legalActionTables(walls):
+        """
+        Returns two dictionaries for a walls Grid, keyed by every free
+        integer position: the actions getPossibleActions allows there, and a
+        dictionary from the direction a ghost faces to the actions
+        GhostRules allows it (no STOP, and no turning back unless it is the
+        only way).  They are built the first time these walls are seen and
+        shared by every state of the layout; the lists in them must not be
+        changed, so hand out copies.
+        """
+        global _lastWalls, _lastTables
+        if walls is _lastWalls:
+            return _lastTables
+        tables = _ACTION_TABLES.get(walls)
+        if tables is None:
+            possible, ghost = {}, {}
+            for x in range(walls.width):
+                for y in range(walls.height):
+                    if walls[x][y]:
+                        continue
+                    possible[(x, y)] = [dir for dir, (dx, dy) in Actions._directionsAsList
+                                        if Actions._isFree(walls, x + dx, y + dy)]
+                    ghost[(x, y)] = {}
+                    for direction in Actions._directions:
+                        legal = [dir for dir in possible[(x, y)]
+                                 if dir != Directions.STOP]
+                        reverse = Actions.reverseDirection(direction)
+                        if reverse in legal and len(legal) > 1:
+                            legal.remove(reverse)
+                        ghost[(x, y)][direction] = legal
+            tables = possible, ghost
+            _ACTION_TABLES[walls.copy()] = tables
+        _lastWalls, _lastTables = walls, tables
+        return tables
+    legalActionTables = staticmethod(legalActionTables)
+
     def getLegalNeighbors(position, walls):
         x, y = position
         x_int, y_int = int(x + 0.5), int(y + 0.5)
@@ -393,20 +630,62 @@ class Actions:
     getSuccessor = staticmethod(getSuccessor)
 
 
+# Legal action tables already built, keyed by walls (see Actions.legalActionTables)
+_ACTION_TABLES = {}
+_lastWalls, _lastTables = None, None
+
+
+# Keys of the Zobrist hash of a GameStateData: a random 61-bit number for
+# every food cell, capsule and (agent, position, direction, scared)
+# combination, drawn the first time it is needed from a generator seeded
+# with the combination itself, so that every process uses the same keys
+_ZOBRIST_KEYS = {}
+
+
+def zobristKey(*feature):
+    key = _ZOBRIST_KEYS.get(feature)
+    if key is None:
+        key = _ZOBRIST_KEYS[feature] = random.Random(
+            repr(feature)).getrandbits(61)
+    return key
+
+
+def agentKey(index, agentState):
+    "The Zobrist key of where an agent is, which way it faces and whether it is scared"
+    configuration = agentState.configuration
+    if configuration == None:
+        return zobristKey('agent', index, None)
+    return zobristKey('agent', index, configuration.pos, configuration.direction, agentState.scaredTimer > 0)
+
+
 class GameStateData:
 
     def __init__(self, prevState=None):
         """
-        Generates a new data packet by copying information from its predecessor.
+        Generates a new data packet from its predecessor.
+
+        Nothing is copied: the layout, food, capsules and agent states are
+        shared with the predecessor.  The food Grid and the capsule list are
+        only ever replaced, never changed in place, and an agent state is
+        changed through mutableAgentState, which first gives this packet its
+        own copy.
         """
         if prevState != None:
-            self.food = prevState.food.shallowCopy()
-            self.capsules = prevState.capsules[:]
-            self.agentStates = self.copyAgentStates(prevState.agentStates)
+            self.food = prevState.food
+            self.capsules = prevState.capsules
+            self.agentStates = prevState.agentStates[:]
             self.layout = prevState.layout
             self._eaten = prevState._eaten
             self.score = prevState.score
+            prevState._ownAgentStates = 0  # Its agent states are shared from now on
+            self._zobrist = prevState._zobrist
+            self._unhashedAgents = prevState._unhashedAgents
+        else:
+            self._zobrist = None  # Set by initialize
+            self._unhashedAgents = 0
 
+        # Bit i is set while agentStates[i] belongs to this packet alone
+        self._ownAgentStates = 0
         self._foodEaten = None
         self._foodAdded = None
         self._capsuleEaten = None
@@ -416,15 +695,41 @@ class GameStateData:
         self.scoreChange = 0
 
     def deepCopy(self):
+        "A copy that can be changed (through mutableAgentState) without changing this one"
         state = GameStateData(self)
-        state.food = self.food.deepCopy()
-        state.layout = self.layout.deepCopy()
         state._agentMoved = self._agentMoved
         state._foodEaten = self._foodEaten
         state._foodAdded = self._foodAdded
         state._capsuleEaten = self._capsuleEaten
         return state
 
+    def mutableAgentState(self, index):
+        "Returns the AgentState of an agent for changing it, copying it first if it is shared"
+        if not self._ownAgentStates >> index & 1:
+            self.agentStates[index] = self.agentStates[index].copy()
+            self._ownAgentStates |= 1 << index
+        if self._zobrist != None and not self._unhashedAgents >> index & 1:
+            # __hash__ adds the new key back
+            self._zobrist ^= agentKey(index, self.agentStates[index])
+            self._unhashedAgents |= 1 << index
+        return self.agentStates[index]
+
+    def updateHash(self, *feature):
+        "Toggles a food cell ('food', position) or a capsule ('capsule', position) in the Zobrist hash"
+        if self._zobrist != None:
+            self._zobrist ^= zobristKey(*feature)
+
+    def zobristHash(self):
+        "Computes the Zobrist hash of the food, capsules and agents from scratch"
+        h = 0
+        for cell in self.food.asList():
+            h ^= zobristKey('food', cell)
+        for capsule in self.capsules:
+            h ^= zobristKey('capsule', capsule)
+        for index, agentState in enumerate(self.agentStates):
+            h ^= agentKey(index, agentState)
+        return h
+
     def copyAgentStates(self, agentStates):
         copiedStates = []
         for agentState in agentStates:
@@ -451,14 +756,36 @@ class GameStateData:
     def __hash__(self):
         """
         Allows states to be keys of dictionaries.
+
+        The Zobrist hash is kept up to date as the rules change the state:
+        eating toggles the key of a food cell or capsule, and the agents
+        changed since the last call get their new keys here.
+
+        Pacman eats a dot and the capsule, then the scared ghost, then the
+        last dot, and the hash always matches one computed from scratch:
+
+        >>> import layout, pacman
+        >>> state = pacman.GameState()
+        >>> state.initialize(layout.Layout(['%%%%%%%', '%P.o.G%', '%%%%%%%']), 1)
+        >>> for agent, action in [(0, 'East'), (1, 'West'), (0, 'East'), (1, 'West'), (0, 'East')]:
+        ...     state = state.generateSuccessor(agent, action)
+        ...     data = state.data
+        ...     print(data.food.count(), len(data.capsules), data.agentStates[1].scaredTimer, data.score,
+        ...           hash(data) == data.zobristHash() ^ hash(data.score))
+        1 1 0 9 True
+        1 1 0 9 True
+        1 0 40 8 True
+        1 0 0 208 True
+        0 0 0 717 True
         """
-        for i, state in enumerate(self.agentStates):
-            try:
-                int(hash(state))
-            except TypeError as e:
-                print(e)
-                # hash(state)
-        return int((hash(tuple(self.agentStates)) + 13*hash(self.food) + 113 * hash(tuple(self.capsules)) + 7 * hash(self.score)) % 1048575)
+        if self._zobrist == None:
+            self._zobrist, self._unhashedAgents = self.zobristHash(), 0
+        if self._unhashedAgents:
+            for index in range(len(self.agentStates)):
+                if self._unhashedAgents >> index & 1:
+                    self._zobrist ^= agentKey(index, self.agentStates[index])
+            self._unhashedAgents = 0
+        return self._zobrist ^ hash(self.score)
 
     def __str__(self):
         width, height = self.layout.width, self.layout.height
@@ -525,6 +852,8 @@ class GameStateData:
         self.score = 0
         self.scoreChange = 0
 
+        # A new game: forget the positions of the last one
+        Configuration._interned.clear()
         self.agentStates = []
         numGhosts = 0
         for isPacman, pos in layout.agentPositions:
@@ -536,6 +865,8 @@ class GameStateData:
             self.agentStates.append(AgentState(
                 Configuration(pos, Directions.STOP), isPacman))
         self._eaten = [False for a in self.agentStates]
+        self._ownAgentStates = (1 << len(self.agentStates)) - 1
+        self._zobrist, self._unhashedAgents = self.zobristHash(), 0
 
 
 try:
@@ -15,6 +15,7 @@
 from util import manhattanDistance
 from game import Directions
 import random, util
+import distanceCalculator
 
 from game import Agent
 from pacman import GameState
@@ -81,9 +82,11 @@ class ReflexAgent(Agent):
         elif currentGameState.isLose():
             return -float("inf")
 
+        Distancer = distanceCalculator.getDistancer(successorGameState.getWalls(), successorGameState.data.layout)   # Maze distances are computed once per layout
+
         ClosestFood = float("inf")
         for food in newFood.asList():
-            ClosestFood = min(ClosestFood, manhattanDistance(newPos, food)) # Taking the closest food to pacman using manhattan
+            ClosestFood = min(ClosestFood, Distancer.getDistance(newPos, food)) # Taking the closest food to pacman using the maze distance
 
         for ghost in successorGameState.getGhostPositions():
             if (manhattanDistance(newPos, ghost) <= 1):           # If there is a ghost too close to pacman then give a really low value to change direction
@@ -347,9 +350,11 @@ def betterEvaluationFunction(currentGameState: GameState):
     elif currentGameState.isLose():
         return -float("inf")
 
+    Distancer = distanceCalculator.getDistancer(currentGameState.getWalls(), currentGameState.data.layout)  # Maze distances are computed once per layout
+
     ClosestFood = float("inf")
     for food in Food.asList():
-        ClosestFood = min(ClosestFood, manhattanDistance(PacmanPosition, food)) # Taking the closest food to pacman using manhattan
+        ClosestFood = min(ClosestFood, Distancer.getDistance(PacmanPosition, food)) # Taking the closest food to pacman using the maze distance
 
     for capsule in Capsules:
         if (manhattanDistance(PacmanPosition, capsule) <= 2):   # If pacman is near to a capsule i give higher score because i want to eat it 
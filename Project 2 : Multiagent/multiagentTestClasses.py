@@ -28,7 +28,7 @@ from pprint import PrettyPrinter
 pp = PrettyPrinter()
 
 from game import Agent
-from pacman import GameState
+from pacman import GameState, ExploredStates
 from ghostAgents import RandomGhost, DirectionalGhost
 import random
 import math
@@ -147,8 +147,13 @@ def run(lay, layName, pac, ghosts, disp, nGames=1, name='games'):
     """
     starttime = time.time()
     print('*** Running %s on' % name, layName, '%d time(s).' % nGames)
-    games = pacman.runGames(lay, pac, ghosts, disp,
-                            nGames, False, catchExceptions=True, timeout=120)
+    # a crashed agent never gets to restore the tracker it installed
+    tracker = GameState.tracker
+    try:
+        games = pacman.runGames(lay, pac, ghosts, disp,
+                                nGames, False, catchExceptions=True, timeout=120)
+    finally:
+        GameState.trackExploration(tracker)
     print('*** Finished running %s on' % name, layName,
           'after %d seconds.' % (time.time() - starttime))
     stats = {'time': time.time() - starttime, 'wins': [g.state.isWin() for g in games].count(True), 'games': games, 'scores': [g.state.getScore() for g in games],
@@ -183,6 +188,11 @@ class GradingAgent(Agent):
         if 'registerInitialState' in dir(self.studentAgent):
             self.studentAgent.registerInitialState(state)
         random.seed(self.seed)
+        # count the distinct states the student agent explores at every move
+        self.previousTracker = GameState.trackExploration(ExploredStates())
+
+    def final(self, state):
+        GameState.trackExploration(self.previousTracker)
 
     def getAction(self, state):
         GameState.getAndResetExplored()
@@ -292,6 +302,10 @@ class PolyAgent(Agent):
             if 'registerInitialState' in dir(agent):
                 agent.registerInitialState(state)
         random.seed(self.seed)
+        self.previousTracker = GameState.trackExploration(ExploredStates())
+
+    def final(self, state):
+        GameState.trackExploration(self.previousTracker)
 
     def getAction(self, state):
         # survey agents
@@ -43,6 +43,7 @@ from game import GameStateData
 from game import Game
 from game import Directions
 from game import Actions
+from game import Configuration
 from util import nearestPoint
 from util import manhattanDistance
 import util
@@ -58,6 +59,28 @@ import os
 ###################################################
 
 
+class ExploredStates:
+    """
+    An exploration tracker for GameState.trackExploration that remembers every
+    distinct state a successor was generated from or to.  These are the
+    "states explored" the autograder compares, and keeping them means hashing
+    two states per successor.
+    """
+
+    def __init__(self):
+        self.states = set()
+
+    def record(self, parent, child):
+        self.states.add(parent)
+        self.states.add(child)
+
+    def reset(self):
+        "Returns the states recorded so far and starts over"
+        states, self.states = self.states, set()
+        return states
+
+
+
 class GameState:
     """
     A GameState specifies the full game state, including the food, capsules,
@@ -77,20 +100,50 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had getLegalActions called
-    explored = set()
+    # static variable: the exploration tracker told about every successor
+    # generated (ExploredStates or anything with record and reset methods),
+    # None while nothing is tracked
+    tracker = None
+
+    def trackExploration(tracker):
+        """
+        Installs an exploration tracker, or turns tracking off with None, and
+        returns the previous one.
+
+        >>> import layout
+        >>> state = GameState()
+        >>> state.initialize(layout.getLayout('testClassic'), 1)
+        >>> previous = GameState.trackExploration(ExploredStates())
+        >>> actions = state.getLegalActions(0)
+        >>> for action in actions + actions:       # The same successors twice
+        ...     successor = state.generateSuccessor(0, action)
+        >>> len(GameState.getAndResetExplored()) == 1 + len(actions), len(GameState.getAndResetExplored())
+        (True, 0)
+        >>> GameState.trackExploration(previous).__class__.__name__
+        'ExploredStates'
+        >>> successor = state.generateSuccessor(0, action)
+        >>> GameState.getAndResetExplored()
+        set()
+        """
+        previous = GameState.tracker
+        GameState.tracker = tracker
+        return previous
+    trackExploration = staticmethod(trackExploration)
 
     def getAndResetExplored():
-        tmp = GameState.explored.copy()
-        GameState.explored = set()
-        return tmp
+        """
+        Returns what the tracker recorded since the last call and starts over
+        (an empty set if nothing is tracked).
+        """
+        if GameState.tracker is None:
+            return set()
+        return GameState.tracker.reset()
     getAndResetExplored = staticmethod(getAndResetExplored)
 
     def getLegalActions(self, agentIndex=0):
         """
         Returns the legal actions for the agent specified.
         """
-#        GameState.explored.add(self)
         if self.isWin() or self.isLose():
             return []
 
@@ -121,7 +174,7 @@ class GameState:
         if agentIndex == 0:
             state.data.scoreChange += -TIME_PENALTY  # Penalty for waiting around
         else:
-            GhostRules.decrementTimer(state.data.agentStates[agentIndex])
+            GhostRules.decrementTimer(state.data.mutableAgentState(agentIndex))
 
         # Resolve multi-agent effects
         GhostRules.checkDeath(state, agentIndex)
@@ -129,8 +182,8 @@ class GameState:
         # Book keeping
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        if GameState.tracker is not None:
+            GameState.tracker.record(self, state)
         return state
 
     def getLegalPacmanActions(self):
@@ -348,7 +401,7 @@ class PacmanRules:
         """
         Returns a list of possible actions.
         """
-        return Actions.getPossibleActions(state.getPacmanState().configuration, state.data.layout.walls)
+        return Actions.getPossibleActions(state.data.agentStates[0].configuration, state.data.layout.walls)
     getLegalActions = staticmethod(getLegalActions)
 
     def applyAction(state, action):
@@ -359,7 +412,7 @@ class PacmanRules:
         if action not in legal:
             raise Exception("Illegal action " + str(action))
 
-        pacmanState = state.data.agentStates[0]
+        pacmanState = state.data.mutableAgentState(0)
 
         # Update Configuration
         vector = Actions.directionToVector(action, PacmanRules.PACMAN_SPEED)
@@ -381,6 +434,7 @@ class PacmanRules:
             state.data.scoreChange += 10
             state.data.food = state.data.food.copy()
             state.data.food[x][y] = False
+            state.data.updateHash('food', position)
             state.data._foodEaten = position
             # TODO: cache numFood?
             numFood = state.getNumFood()
@@ -389,11 +443,13 @@ class PacmanRules:
                 state.data._win = True
         # Eat capsule
         if(position in state.getCapsules()):
-            state.data.capsules.remove(position)
+            state.data.capsules = [
+                capsule for capsule in state.data.capsules if capsule != position]
+            state.data.updateHash('capsule', position)
             state.data._capsuleEaten = position
             # Reset all ghosts' scared timers
             for index in range(1, len(state.data.agentStates)):
-                state.data.agentStates[index].scaredTimer = SCARED_TIME
+                state.data.mutableAgentState(index).scaredTimer = SCARED_TIME
     consume = staticmethod(consume)
 
 
@@ -409,6 +465,12 @@ class GhostRules:
         reach a dead end, but can turn 90 degrees at intersections.
         """
         conf = state.getGhostState(ghostIndex).configuration
+        legal = Actions.legalActionTables(
+            state.data.layout.walls)[1].get(conf.pos)
+        if legal is not None:
+            return legal[conf.direction][:]
+
+        # A scared ghost between grid points
         possibleActions = Actions.getPossibleActions(
             conf, state.data.layout.walls)
         reverse = Actions.reverseDirection(conf.direction)
@@ -425,7 +487,7 @@ class GhostRules:
         if action not in legal:
             raise Exception("Illegal ghost action " + str(action))
 
-        ghostState = state.data.agentStates[ghostIndex]
+        ghostState = state.data.mutableAgentState(ghostIndex)
         speed = GhostRules.GHOST_SPEED
         if ghostState.scaredTimer > 0:
             speed /= 2.0
@@ -437,8 +499,10 @@ class GhostRules:
     def decrementTimer(ghostState):
         timer = ghostState.scaredTimer
         if timer == 1:
-            ghostState.configuration.pos = nearestPoint(
-                ghostState.configuration.pos)
+            # Shared with earlier states, so it is replaced
+            configuration = ghostState.configuration
+            ghostState.configuration = Configuration(
+                nearestPoint(configuration.pos), configuration.direction)
         ghostState.scaredTimer = max(0, timer - 1)
     decrementTimer = staticmethod(decrementTimer)
 
@@ -449,12 +513,14 @@ class GhostRules:
                 ghostState = state.data.agentStates[index]
                 ghostPosition = ghostState.configuration.getPosition()
                 if GhostRules.canKill(pacmanPosition, ghostPosition):
-                    GhostRules.collide(state, ghostState, index)
+                    GhostRules.collide(
+                        state, state.data.mutableAgentState(index), index)
         else:
             ghostState = state.data.agentStates[agentIndex]
             ghostPosition = ghostState.configuration.getPosition()
             if GhostRules.canKill(pacmanPosition, ghostPosition):
-                GhostRules.collide(state, ghostState, agentIndex)
+                GhostRules.collide(
+                    state, state.data.mutableAgentState(agentIndex), agentIndex)
     checkDeath = staticmethod(checkDeath)
 
     def collide(state, ghostState, agentIndex):
@@ -463,6 +529,7 @@ class GhostRules:
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
             # Added for first-person
+            state.data._eaten = state.data._eaten[:]
             state.data._eaten[agentIndex] = True
         else:
             if not state.data._win:
@@ -0,0 +1,100 @@
+# successorBenchmark.py
+# ---------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+A micro-benchmark of GameState.generateSuccessor, the call adversarial
+search makes for every node of its tree.
+
+For Pacman and for every ghost of a layout it reports the time per call,
+and the memory blocks and bytes each successor keeps allocated while it is
+alive (the successors are held in a list, like the nodes of a search tree),
+as well as the time and memory of GameState.deepCopy:
+
+  python successorBenchmark.py
+  python successorBenchmark.py -l originalClassic -n 50000
+"""
+
+import sys
+import time
+import tracemalloc
+
+import layout
+import pacman
+
+
+def measure(function, calls):
+    """
+    Calls function calls times and returns the seconds per call and the
+    blocks and bytes still allocated per call while the results are held.
+    """
+    results = []
+    blocks = sys.getallocatedblocks()
+    for i in range(calls):
+        results.append(function(i))
+    blocks = sys.getallocatedblocks() - blocks
+    del results
+
+    results = []
+    tracemalloc.start()
+    try:
+        for i in range(calls):
+            results.append(function(i))
+        # The list holding the results is not part of the cost
+        allocated = tracemalloc.get_traced_memory()[0] - sys.getsizeof(results)
+    finally:
+        tracemalloc.stop()
+    del results
+
+    started = time.perf_counter()
+    for i in range(calls):
+        function(i)
+    seconds = time.perf_counter() - started
+    return seconds / calls, blocks / float(calls), allocated / float(calls)
+
+
+def run(layoutName, calls, numGhosts):
+    lay = layout.getLayout(layoutName)
+    if lay == None:
+        raise Exception("The layout " + layoutName + " cannot be found")
+    state = pacman.GameState()
+    state.initialize(lay, numGhosts)
+
+    print('%-24s %10s %10s %10s' % ('call', 'us/call', 'blocks', 'bytes'))
+    for agentIndex in range(state.getNumAgents()):
+        actions = state.getLegalActions(agentIndex)
+        perCall, blocks, allocated = measure(
+            lambda i: state.generateSuccessor(agentIndex, actions[i % len(actions)]), calls)
+        print('%-24s %10.2f %10.1f %10.1f' % ('generateSuccessor(%d)' % agentIndex, perCall * 1e6, blocks, allocated))
+    perCall, blocks, allocated = measure(lambda i: state.deepCopy(), calls)
+    print('%-24s %10.2f %10.1f %10.1f' % ('deepCopy', perCall * 1e6, blocks, allocated))
+
+
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser('USAGE:      python successorBenchmark.py <options>')
+    parser.add_option('-l', '--layout', dest='layout', default='mediumClassic',
+                      help='the layout to start from [Default: %default]')
+    parser.add_option('-n', '--calls', dest='calls', type='int', default=20000,
+                      help='calls measured for each agent [Default: %default]')
+    parser.add_option('-k', '--numghosts', dest='numGhosts', type='int', default=4,
+                      help='the maximum number of ghosts [Default: %default]')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    run(options.layout, options.calls, options.numGhosts)
@@ -29,6 +29,7 @@
 import sys
 import inspect
 import heapq
+from collections import deque
 import random
 import io
 
@@ -157,23 +158,31 @@ class Queue:
     "A container with a first-in-first-out (FIFO) queuing policy."
 
     def __init__(self):
-        self.list = []
+        self.list = deque()
 
     def push(self, item):
         "Enqueue the 'item' into the queue"
-        self.list.insert(0, item)
+        self.list.append(item)
+
+    def pushMany(self, items):
+        "Enqueue all the 'items', in order, into the queue"
+        self.list.extend(items)
 
     def pop(self):
         """
         Dequeue the earliest enqueued item still in the queue. This
         operation removes the item from the queue.
         """
-        return self.list.pop()
+        return self.list.popleft()
 
     def isEmpty(self):
         "Returns true if the queue is empty"
         return len(self.list) == 0
 
+    def __len__(self):
+        "Returns the number of items in the queue"
+        return len(self.list)
+
 
 class PriorityQueue:
     """
@@ -327,10 +336,7 @@ class Counter(dict):
         >>> a.sortedKeys()
         ['second', 'third', 'first']
         """
-        sortedItems = list(self.items())
-
-        def compare(x, y): return sign(y[1] - x[1])
-        sortedItems.sort(cmp=compare)
+        sortedItems = sorted(self.items(), key=lambda x: -x[1])
         return [x[0] for x in sortedItems]
 
     def totalCount(self):